@@ -0,0 +1,112 @@
+import os
+import time
+import multiprocessing
+import numpy as np
+
+from src.inputdata.Parameters import Parameters as params
+from src.inputdata.DemandLoader import DemandLoader
+from src.inputdata.ProblemData import ProblemData
+from src.inputdata.RandomStreams import RandomStreams
+from src.solvers.DeterministicSolver import DeterministicSolver
+from src.solvers.RobustSolver import RobustSolver
+from src.solvers.LpExporter import LpExporter
+
+
+# Plans every store of the input file: the rolling deterministic/robust planning of InventoryPlanner is run
+# for each store (with the current experiment parameters) and the reposition decisions are kept per store.
+# The input data is loaded once and shared (memory mapped cache); independent stores are planned in parallel.
+class BatchPlanner:
+    def __init__(self, stores=None, models=("deterministic", "robust"), numWorkers=None):
+        self.rows = DemandLoader(params.dataFile, params.dataCacheDir).load()
+        self.stores = np.unique(self.rows["store"]) if stores is None else np.asarray(stores)
+        self.models = models
+        self.numWorkers = params.numWorkers if numWorkers is None else numWorkers
+        self.initialDay = params.initialDay
+        self.finalDay = self.initialDay + params.horizon
+        self.repositions = {}  # model -> (stores, days) repositions, nan for the skipped stores
+        self.elapsed = 0.0
+
+    def run(self):
+        print "Planning " + str(len(self.stores)) + " stores..."
+        start = time.time()
+
+        if self.numWorkers <= 1:
+            plans = [planStore(store, self.rows, self.models) for store in self.stores]
+        else:
+            pool = multiprocessing.Pool(self.numWorkers, initializer=initStoreWorker, initargs=(self.models,))
+            try:
+                plans = pool.map(planWorkerStore, self.stores, chunksize=max(1, len(self.stores) // (4 * self.numWorkers)))
+            finally:
+                pool.close()
+                pool.join()
+
+        self.elapsed = time.time() - start
+        for model in self.models:
+            self.repositions[model] = np.array([plan[model] for plan in plans]).reshape(len(self.stores), -1)
+
+        skipped = sum(1 for plan in plans if np.isnan(plan[self.models[0]]).all())
+        print "Planned %d stores in %.2fs (%.2f stores/s), %d skipped (not enough days)" % \
+              (len(self.stores), self.elapsed, self.getThroughput(), skipped)
+        return self.repositions
+
+    def getThroughput(self):
+        return len(self.stores) / self.elapsed if self.elapsed > 0 else 0.0
+
+    # Repositions planned for a store, {model: array over the planning days}
+    def getStorePlan(self, store):
+        i = int(np.flatnonzero(self.stores == store)[0])
+        return dict((model, self.repositions[model][i]) for model in self.models)
+
+    def save(self, filename):
+        if not os.path.exists(os.path.dirname(filename)):
+            os.makedirs(os.path.dirname(filename))
+
+        arrays = dict((model + "_repositions", values) for model, values in self.repositions.items())
+        np.savez_compressed(filename, stores=self.stores, days=np.arange(self.initialDay, self.finalDay), **arrays)
+
+
+# Rolling planning of one store: {model: repositions of each planning day}, all nan if the store has
+# fewer days than the planning needs (the forecasts of the last planning day reach finalDay - 1 + horizon - 1)
+def planStore(store, rows, models):
+    initialDay = params.initialDay
+    finalDay = initialDay + params.horizon
+    data = ProblemData(int(store), rows)
+    if data.numDays < finalDay + params.horizon - 1:
+        return dict((model, np.full(finalDay - initialDay, np.nan)) for model in models)
+
+    # every store gets its own random streams, so the plans do not depend on the order (or process) stores are
+    # planned in
+    streams = RandomStreams(experiment=RandomStreams.getCurrentExperiment() + (int(store),))
+    data.setRepositionDays()
+    data.computeForecasts(initialDay, finalDay, streams)
+
+    solvers = {"deterministic": DeterministicSolver(data), "robust": RobustSolver(data, streams)}
+    try:
+        for t in range(initialDay, finalDay):
+            for model in models:
+                solvers[model].solve(t)
+    finally:
+        LpExporter.flush()  # the worker processes exit without the atexit handlers
+
+    return dict((model, np.array(solvers[model].repositions[initialDay:finalDay], dtype=float)) for model in models)
+
+
+# Each worker process loads (maps) the input data once
+workerRows = None
+workerModels = None
+
+
+def initStoreWorker(models):
+    global workerRows, workerModels
+    workerRows = DemandLoader(params.dataFile, params.dataCacheDir).load()
+    workerModels = models
+
+
+def planWorkerStore(store):
+    return planStore(store, workerRows, workerModels)
+
+
+if __name__ == "__main__":
+    planner = BatchPlanner()
+    planner.run()
+    planner.save("../output/Stores/repositions.npz")
@@ -1,24 +1,30 @@
 from datetime import datetime
 
 import os
+import multiprocessing
 import numpy as np
-import matplotlib
-import matplotlib.pyplot as plt
-import matplotlib.gridspec as gridspec
-import matplotlib.animation as animation
-from matplotlib.font_manager import FontProperties
 
 from src.inputdata.Parameters import Parameters as params
 from src.inputdata.ProblemData import ProblemData
+from src.inputdata.ExperimentConfig import ExperimentConfig
+from src.inputdata.RandomStreams import RandomStreams
 from src.solvers.DeterministicSolver import DeterministicSolver
 from src.solvers.RobustSolver import RobustSolver
+from src.solvers.Instrumentation import Instrumentation
+from src.solvers.LpExporter import LpExporter
 from src.solutiondata.SimulationData import SimulationData
+from src.solutiondata.SimulationEngine import SimulationEngine
+from src.solutiondata.MonteCarloEvaluator import MonteCarloEvaluator
+from src.solutiondata.ResultStore import ResultStore
+from src.solutiondata.ResultCache import ResultCache
+from src.solutiondata.Checkpoint import Checkpoint
+from src.graphics.RenderPool import RenderPool
 
 
 class InventoryPlanner:
     def __init__(self):
         self.data = ProblemData()
-        self.totalDays = len(self.data.demandDataList)
+        self.totalDays = self.data.numDays
         self.initialDay = params.initialDay
         self.finalDay = self.initialDay + params.horizon
         self.date = datetime.now()
@@ -26,309 +32,196 @@ class InventoryPlanner:
         self.rSolver = RobustSolver(self.data)
         self.dSimulationData = SimulationData()
         self.rSimulationData = SimulationData()
-        matplotlib.rcParams.update({'font.size': 10})
+        self.results = ResultStore()
 
-        np.random.seed(0)
-
-    def runBatchExperiments(self):
+    def runBatchExperiments(self, numWorkers=None):
         print "Starting inventory planning..."
+        numWorkers = params.numWorkers if numWorkers is None else numWorkers
+        grid = ExperimentConfig.createGrid()
+
+        # The graphs and animations are rendered by a separate pool while the next experiments are being solved
+        # (with plotMode "off" the pool only renders the animations)
+        renderer = None
+        if params.plotMode != "off" or params.animationMode != "off":
+            renderer = RenderPool(params.renderWorkers if params.plotMode != "inline" else 0)
+
+        # Call both solvers, deterministic and robust for each planning day of each experiment.
+        # Every experiment has its own random streams, so a parallel run gives the same results as a serial one.
+        results = []
+        try:
+            if numWorkers <= 1:
+                for config in grid:
+                    results.append(self.runExperiment(config))
+                    self.renderResults(renderer, config)
+            else:
+                pool = multiprocessing.Pool(numWorkers, initializer=initWorker)
+                try:
+                    for result in pool.imap(runWorkerExperiment, grid):
+                        results.append(result)
+                        self.renderResults(renderer, result[0])
+                finally:
+                    pool.close()
+                    pool.join()
+        finally:
+            if renderer is not None:
+                renderer.close()
+        return results
+
+    # With the result cache, the outputs are stamped with the experiment key, what is rendered and the graphics
+    # source, so the graphs of an experiment that is loaded from the cache are only rendered if they are outdated
+    def renderResults(self, renderer, config):
+        if renderer is not None:
+            path = self.getOutputPath(config=config)
+            stamp = 0
+            if params.resultCache:
+                stamp = ResultCache().getKey(config) + " " + str(params.plotMode != "off") + " " + \
+                        params.animationMode + " " + ResultCache.getSourceHash(("graphics",))
+                if RenderPool.isRendered(path, stamp):
+                    print "Graphs of " + path + " are up to date"
+                    return
+
+            if params.plotMode != "off":
+                self.getOutputPath("DailyGraphs/", config)
+            if params.animationMode != "off":
+                self.getOutputPath("Simulation/", config)
+            renderer.submit(path + "results.npz", path, params.animationMode, stamp, params.plotMode != "off")
+
+    def runExperiment(self, config):
+        config.apply()
+        cache = ResultCache() if params.resultCache else None
+        if cache is not None:
+            key = cache.getKey(config)
+            simulations = cache.load(key, self.getOutputPath())
+            if simulations is not None:
+                print "Loaded cached experiment " + key
+                self.setSimulationArrays(simulations)
+                return config, self.dSimulationData, self.rSimulationData
+
+        # the exported lps are written by a background thread, the pool workers exit without running the atexit
+        # handlers, so they are flushed at the end of every experiment
+        try:
+            self.executePlanning(config)
+        finally:
+            LpExporter.flush()
+
+        if cache is not None:
+            cache.store(key, self.getOutputPath(), self.getSimulationArrays())
+        return config, self.dSimulationData, self.rSimulationData
+
+    # Saves the state after planning day t: solvers and forecasts (the scenarios of the next days come from their
+    # own random streams).
+    # The key (see ResultCache) tells the experiment, so a checkpoint is never resumed with other inputs.
+    def saveCheckpoint(self, key, t):
+        state = {"key": key, "day": t, "forecast": self.data.forecast,
+                 "deterministic": self.dSolver.getState(), "robust": self.rSolver.getState()}
+        Checkpoint.save(self.getOutputPath() + "checkpoint.pkl", state)
+
+    # Restores the last checkpoint of the experiment, returns the first day still to be planned
+    def loadCheckpoint(self, key):
+        state = Checkpoint.load(self.getOutputPath() + "checkpoint.pkl")
+        if state is None or state["key"] != key:
+            return self.initialDay
+
+        self.data.forecast = state["forecast"]
+        self.dSolver.setState(state["deterministic"])
+        self.rSolver.setState(state["robust"])
+        print "Resuming from the checkpoint of day " + str(state["day"])
+        return state["day"] + 1
+
+    # Simulation data of both solvers as "<model>_<field>" arrays
+    def getSimulationArrays(self):
+        arrays = {}
+        for model, simulation in (("deterministic", self.dSimulationData), ("robust", self.rSimulationData)):
+            for field in ("obj", "fault", "stock", "reposition"):
+                arrays[model + "_" + field] = np.asarray(getattr(simulation, field), dtype=float)
+        return arrays
+
+    def setSimulationArrays(self, arrays):
+        fields = ("obj", "fault", "stock", "reposition")
+        self.dSimulationData = SimulationData(*[arrays["deterministic_" + field] for field in fields])
+        self.rSimulationData = SimulationData(*[arrays["robust_" + field] for field in fields])
+
+    # Rolling horizon planning of the current experiment. With the experiment config, the planning state is
+    # checkpointed every Parameters.checkpointInterval days and, in resume mode, restored from the last checkpoint.
+    def executePlanning(self, config=None):
+        Instrumentation.begin("planner")
 
-        # Call both solvers, deterministic and robust for each planning day
-        for u in params.uncertainties:
-            params.currentUncertainty = u
-            for r in params.robustness:
-                params.currentRobustness = r
-                for ri in params.repositionIntervals:
-                    params.currentRepositionInterval = ri
-                    for lt in params.leadTimes:
-                        params.currentLeadTime = lt
-                        self.executePlanning()
-
-    def executePlanning(self):
         # initialize problem data
         self.data.setRepositionDays()
 
-        # create solvers
+        # create solvers, the random numbers of the experiment only depend on its configuration
+        streams = config.getStreams() if config is not None else RandomStreams()
         self.dSolver = DeterministicSolver(self.data)
-        self.rSolver = RobustSolver(self.data)
+        self.rSolver = RobustSolver(self.data, streams)
 
-        for t in range(self.initialDay, self.finalDay):
-            # compute forecast for current day
-            self.data.computeForecast(t)
+        # compute the demand forecast of every planning day
+        self.data.computeForecasts(self.initialDay, self.finalDay, streams)
+        Instrumentation.mark("planner", "forecasts")
 
+        firstDay = self.initialDay
+        checkpointKey = 0
+        if config is not None and (params.checkpointInterval > 0 or params.resume):
+            checkpointKey = ResultCache().getKey(config)
+            if params.resume:
+                firstDay = self.loadCheckpoint(checkpointKey)
+
+        for t in range(firstDay, self.finalDay):
             print "Running deterministic solver for day " + str(t)
             self.dSolver.solve(t)
+            Instrumentation.mark("planner", "deterministic")
 
             print "Running robust solver for day " + str(t)
             self.rSolver.solve(t)
+            Instrumentation.mark("planner", "robust")
+
+            if checkpointKey != 0 and params.checkpointInterval > 0 and \
+                    ((t + 1 - self.initialDay) % params.checkpointInterval == 0 or t == self.finalDay - 1):
+                self.saveCheckpoint(checkpointKey, t)
+                Instrumentation.mark("planner", "checkpoint")
 
         self.computeSimulationData()
-        self.saveAndPlotResult()
-        self.doSimulation()
+        Instrumentation.mark("planner", "simulation")
+        if params.monteCarloPaths > 0:
+            self.evaluatePlans()
+            Instrumentation.mark("planner", "monteCarlo")
+        self.saveResults()
+        Instrumentation.mark("planner", "saveResults")
+        Instrumentation.end("planner", days=self.finalDay - self.initialDay)
+
+    # Output folder of the given experiment (by default the current one), created if needed
+    def getOutputPath(self, folder="", config=None):
+        if config is None:
+            config = (params.currentUncertainty, params.currentRobustness, params.currentRepositionInterval, params.currentLeadTime)
+        path = "../output/Error" + str(config[0]) + "_Robustness" + str(config[1]) + \
+               "_RepositionInterval" + str(config[2]) + "_LeadTime" + str(config[3]) + "/" + folder
+        if not os.path.exists(path):
+            os.makedirs(path)
+        return path
+
+    def saveResults(self):
+        config = (params.currentUncertainty, params.currentRobustness, params.currentRepositionInterval, params.currentLeadTime)
+        self.results = ResultStore.create(self.data, config, self.initialDay, self.finalDay, params.horizon,
+                                          (self.rSolver, self.dSolver), (self.rSimulationData, self.dSimulationData))
+        self.results.save(self.getOutputPath() + "results.npz")
+
+        if params.exportCsv:
+            self.results.exportDailyCsv(self.getOutputPath("Results/"))
+            self.results.exportSimulationCsv(self.getOutputPath("Simulation/") + "simulation.csv")
 
     def computeSimulationData(self):
-        # Use obtained repositions to calculate stocks and faults at each day
-        dFault = [0 for i in range(self.totalDays)]
-        rFault = [0 for i in range(self.totalDays)]
-
-        dStock = [0 for i in range(self.totalDays)]
-        rStock = [0 for i in range(self.totalDays)]
-
-        dStock[params.initialDay] = self.data.getInitialStock()
-        rStock[params.initialDay] = self.data.getInitialStock()
-
-        for t in range(self.initialDay, self.finalDay - 1):
-            dStock[t+1] = dStock[t] - self.data.demandDataList[t].demand
-            rStock[t+1] = rStock[t] - self.data.demandDataList[t].demand
-
-            if t-1 > 0:
-                dStock[t+1] += self.dSolver.repositions[t-1]
-                rStock[t+1] += self.rSolver.repositions[t-1]
-
-            if dStock[t+1] < 0:
-                dFault[t+1] = dStock[t+1]
-                dStock[t+1] = 0
-
-            if rStock[t+1] < 0:
-                rFault[t+1] = rStock[t+1]
-                rStock[t+1] = 0
-
-        # compute objective values for each solver
-        dObj = [0 for i in range(self.totalDays)]
-        rObj = [0 for i in range(self.totalDays)]
-
-        for t in range(self.initialDay, self.finalDay):
-            demand = self.data.demandDataList[t].demand
-            dVal = (params.unitPrice*demand) - (params.productAbscenceCost*dFault[t]) - \
-                   (params.unitCost*self.dSolver.repositions[t]) - (params.unitStockageCost*dStock[t])
-            rVal = (params.unitPrice*demand) - (params.productAbscenceCost*rFault[t]) - \
-                   (params.unitCost*self.rSolver.repositions[t]) - (params.unitStockageCost*rStock[t])
-
-            if t == self.initialDay:
-                dObj[t] = dVal
-                rObj[t] = rVal
-            else:
-                dObj[t] = dObj[t-1] + dVal
-                rObj[t] = rObj[t-1] + rVal
-
-        self.dSimulationData = SimulationData(dObj,dFault,dStock,self.dSolver.repositions)
-        self.rSimulationData = SimulationData(rObj,rFault,rStock,self.rSolver.repositions)
+        # Use obtained repositions to calculate stocks and faults at each day, for both solvers at once
+        engine = SimulationEngine(self.data.demand, self.data.getInitialStock(), self.initialDay, self.finalDay)
+        obj, fault, stock = engine.run([self.dSolver.repositions, self.rSolver.repositions], params.currentLeadTime)
 
-    def saveAndPlotResult(self):
-        fig = plt.figure()
-        fontP = FontProperties()
-        fontP.set_size('small')
-        for day in range(params.initialDay, params.initialDay + params.horizon):
-            fig.clf()
-            fig.suptitle('Results for Day ' + str(day) + " | Error: " + str(params.currentUncertainty) +
-                         " | Robustness: " + str(params.currentRobustness) + " | RepInterval: " +
-                         str(params.currentRepositionInterval) + " | LeadTime: " + str(params.currentLeadTime), size=13)
-            gs = gridspec.GridSpec(3, 3, hspace=0.9, wspace=0.5)
-
-            # Demand data result
-            ax1 = fig.add_subplot(gs[0, : ])
-
-            days = np.arange(day, day + params.horizon)
-            demand = [0 for i in range(params.horizon)]
-            forecast = [0 for i in range(params.horizon)]
-            error = [0 for i in range(params.horizon)]
-            cont = 0
-
-            for t in range(day, day + params.horizon):
-                demand[cont] = self.data.demandDataList[t].demand
-                forecast[cont] = self.data.getForecast(day,t)
-                error[cont] = forecast[cont] * (self.data.getCurrentUncertaintyInterval(day, t)/5)
-                cont += 1
-
-            ax1.errorbar(days, forecast, yerr=error, fmt='o')
-
-            ax1.plot(days, forecast, label="Forecast Demand")
-            ax1.plot(days, demand, label="Real Demand")
-            ax1.set_xlim(day, day+params.horizon)
-            ax1.set_ylim(0,max(error) + max(forecast) + 2000)
-            ax1.legend(loc='upper center', bbox_to_anchor=(0.5, 1.3), ncol=2, fancybox=True, shadow=True)
-
-            # Robust stock
-            ax2 = fig.add_subplot(gs[1, 0])
-            ax2.set_title("Stock", size=12)
-            ax2.set_ylim(0,max(self.rSolver.plannedStocks[day]) + 10000)
-
-            ax2.bar(days, self.rSolver.plannedStocks[day][day:day+params.horizon], color="b")
-
-            # Robust reposition
-            ax3 = fig.add_subplot(gs[1, 1])
-            ax3.set_title("Reposition", size=12)
-
-            ylim3 = max(self.rSolver.plannedRepositions[day]) + 10000
-            ax3.set_ylim(0, ylim3)
-
-            ax3.text((len(days) / 2.) + min(days), ylim3 * 1.45, 'Robust Model', size=13,
-                horizontalalignment='center',
-                verticalalignment='top',
-                multialignment='center')
-
-            ax3.bar(days, self.rSolver.plannedRepositions[day][day:day+params.horizon], color="g")
-
-            # Robust fault
-            ax4 = fig.add_subplot(gs[1, 2])
-            ax4.set_title("Lack", size=12)
-            ax4.set_ylim(0,max(self.rSolver.plannedFaults[day]) + 10000)
-
-            ax4.bar(days, self.rSolver.plannedFaults[day][day:day+params.horizon], color="r")
-
-            # Deterministic stock
-            ax5 = fig.add_subplot(gs[2, 0])
-            ax5.set_title("Stock", size=12)
-            ax5.set_ylim(0,max(self.dSolver.plannedStocks[day]) + 10000)
-
-            ax5.bar(days, self.dSolver.plannedStocks[day][day:day+params.horizon], color="b")
-
-            # Robust reposition
-            ax6 = fig.add_subplot(gs[2, 1])
-            ax6.set_title("Reposition", size=12)
-
-            ylim6 = max(self.dSolver.plannedRepositions[day]) + 10000
-            ax6.set_ylim(0, ylim6)
-
-            ax6.text((len(days) / 2.) + min(days), ylim6 * 1.45, 'Deterministic Model', size=13,
-                horizontalalignment='center',
-                verticalalignment='top',
-                multialignment='center')
-
-            ax6.bar(days, self.dSolver.plannedRepositions[day][day:day+params.horizon], color="g")
-
-            # Robust fault
-            ax7 = fig.add_subplot(gs[2, 2])
-            ax7.set_title("Lack", size=12)
-            ax7.set_ylim(0,max(self.dSolver.plannedFaults[day]) + 10000)
-
-            ax7.bar(days, self.dSolver.plannedFaults[day][day:day+params.horizon], color="r")
-
-            path = "../output/Error" + str(params.currentUncertainty) + "_Robustness" + str(params.currentRobustness) + \
-                   "_RepositionInterval" + str(params.currentRepositionInterval) + "_LeadTime" + str(params.currentLeadTime) + "/DailyGraphs/"
-            filename = path + "dummy.txt"
-            if not os.path.exists(os.path.dirname(filename)):
-                os.makedirs(os.path.dirname(filename))
-
-            fig.savefig(path + "Graph_Day" + str(day) + ".png",dpi=150,facecolor='white')
-
-            # save file
-            path = "../output/Error" + str(params.currentUncertainty) + "_Robustness" + str(params.currentRobustness) + \
-                   "_RepositionInterval" + str(params.currentRepositionInterval) + "_LeadTime" + str(params.currentLeadTime) + "/Results/"
-            filename = path + "Result_Day" + str(day) + ".csv"
-            if not os.path.exists(os.path.dirname(filename)):
-                os.makedirs(os.path.dirname(filename))
-
-            f = open(filename,"w")
-            line = "Day; Uncertainty; Robustness; Reposition Interval; Lead Time; Real Demand; Forecast; Error; Robust Stock;" \
-                   "Robust Reposition; Robust Lack; Deterministic Stock; Deterministic Reposition; Deterministic Lack\n"
-            f.write(line)
-            cont = 0
-            for t in range(day, day + params.horizon):
-                line = str(t) + ";"
-                line += str(params.currentUncertainty).replace(".",",") + ";"
-                line += str(params.currentRobustness).replace(".",",") + ";"
-                line += str(params.currentRepositionInterval).replace(".",",") + ";"
-                line += str(params.currentLeadTime).replace(".",",") + ";"
-                line += '{:.2f}'.format(demand[cont]).replace(".",",") + ";"
-                line += '{:.2f}'.format(forecast[cont]).replace(".",",") + ";"
-                line += '{:.2f}'.format(error[cont]).replace(".",",") + ";"
-                line += '{:.2f}'.format(self.rSolver.plannedStocks[day][t]).replace(".",",") + ";"
-                line += '{:.2f}'.format(self.rSolver.plannedRepositions[day][t]).replace(".",",") + ";"
-                line += '{:.2f}'.format(self.rSolver.plannedFaults[day][t]).replace(".",",") + ";"
-                line += '{:.2f}'.format(self.dSolver.plannedStocks[day][t]).replace(".",",") + ";"
-                line += '{:.2f}'.format(self.dSolver.plannedRepositions[day][t]).replace(".",",") + ";"
-                line += '{:.2f}'.format(self.dSolver.plannedFaults[day][t]).replace(".",",") + ";"
-                line += "\n"
-                cont += 1
-                f.write(line)
-            f.close()
-
-    def doSimulation(self):
-        print(animation.writers.list())
-        Writer = animation.writers['ffmpeg']
-        writer = Writer(fps=1, metadata=dict(artist='Fabian'), bitrate=1800)
-
-        fontP = FontProperties()
-        fontP.set_size('small')
-
-        fig = plt.figure()
-        fig.suptitle("Simulation | Error: " + str(params.currentUncertainty) +
-                         " | Robustness: " + str(params.currentRobustness) + " | RepInterval: " +
-                         str(params.currentRepositionInterval) + " | LeadTime: " + str(params.currentLeadTime), size=13)
-        gs = gridspec.GridSpec(2, 1, hspace=0.3, wspace=0.5)
-
-        # Obj Functions
-        ax1 = fig.add_subplot(gs[0, 0])
-        ax1.set_ylim(0, max(max(self.dSimulationData.obj), max(self.rSimulationData.obj)) + 100000)
-        ax1.set_xlim(params.initialDay, params.initialDay + params.horizon)
-        roLine, = ax1.plot([],[],"r", label="Robust Obj")
-        doLine, = ax1.plot([],[],"b", label="Deterministic Obj")
-        ax1.legend(loc='upper center', bbox_to_anchor=(0.5, 1.15), ncol=2, fancybox=True, shadow=True, prop=fontP)
-
-        # Stocks
-        ax2 = fig.add_subplot(gs[1, 0])
-        ax2.set_title("Stocks")
-        ax2.set_ylim(0, max(max(self.dSimulationData.stock), max(self.rSimulationData.stock)) + 10000)
-        ax2.set_xlim(params.initialDay, params.initialDay + params.horizon)
-        rsLine, = ax2.plot([],[],"r", label="Robust Stock")
-        dsLine, = ax2.plot([],[],"b", label="Deterministic Stock")
-        ax2.legend(loc='upper center', bbox_to_anchor=(0.5, 1.15), ncol=2, fancybox=True, shadow=True, prop=fontP)
-
-        lineAnimation = animation.FuncAnimation(fig, self.updateFrame, frames=params.horizon+1,
-                                                fargs=(roLine, doLine, rsLine, dsLine),
-                                                interval=1000, blit=True)
-
-        path = "../output/Error" + str(params.currentUncertainty) + "_Robustness" + str(params.currentRobustness) + \
-               "_RepositionInterval" + str(params.currentRepositionInterval) + "_LeadTime" + str(params.currentLeadTime) + "/Simulation/"
-        filename = path + "dummy.txt"
-        if not os.path.exists(os.path.dirname(filename)):
-            os.makedirs(os.path.dirname(filename))
-
-        # save animation
-        lineAnimation.save(path + 'simulation.mp4', writer=writer, savefig_kwargs={'facecolor':'white'})
-
-        # save file
-        filename = path + "simulation.csv"
-        if not os.path.exists(os.path.dirname(filename)):
-            os.makedirs(os.path.dirname(filename))
-
-        f = open(filename,"w")
-        line = "Day; Uncertainty; Robustness; Reposition Interval; Lead Time; Real Demand;" \
-               "Robust Objective; Robust Stock; Robust Reposition; Robust Fault; " \
-               "Deterministic Objective; Deterministic Stock; Deterministic Reposition; Deterministic Fault \n"
-        f.write(line)
+        self.dSimulationData = SimulationData(obj[0], fault[0], stock[0], self.dSolver.repositions)
+        self.rSimulationData = SimulationData(obj[1], fault[1], stock[1], self.rSolver.repositions)
 
-        for t in range(self.initialDay, self.initialDay + params.horizon):
-            line = str(t) + ";"
-            line += str(params.currentUncertainty).replace(".",",") + ";"
-            line += str(params.currentRobustness).replace(".",",") + ";"
-            line += str(params.currentRepositionInterval).replace(".",",") + ";"
-            line += str(params.currentLeadTime).replace(".",",") + ";"
-            line += '{:.2f}'.format(self.data.demandDataList[t].demand).replace(".",",") + ";"
-            line += '{:.2f}'.format(self.rSimulationData.obj[t]).replace(".",",") + ";"
-            line += '{:.2f}'.format(self.rSimulationData.stock[t]).replace(".",",") + ";"
-            line += '{:.2f}'.format(self.rSimulationData.reposition[t]).replace(".",",") + ";"
-            line += '{:.2f}'.format(self.rSimulationData.fault[t]).replace(".",",") + ";"
-            line += '{:.2f}'.format(self.dSimulationData.obj[t]).replace(".",",") + ";"
-            line += '{:.2f}'.format(self.dSimulationData.stock[t]).replace(".",",") + ";"
-            line += '{:.2f}'.format(self.dSimulationData.reposition[t]).replace(".",",") + ";"
-            line += '{:.2f}'.format(self.dSimulationData.fault[t]).replace(".",",") + ";"
-            line += "\n"
-            f.write(line)
-        f.close()
-
-    def updateFrame(self, i, roLine, doLine, rsLine, dsLine, rRline=0):
-        days = [d for d in range(self.initialDay, self.initialDay + i + 1)]
-        robj = self.rSimulationData.obj[self.initialDay:self.initialDay+i+1]
-        dobj = self.dSimulationData.obj[self.initialDay:self.initialDay+i+1]
-        rstock = self.rSimulationData.stock[self.initialDay:self.initialDay+i+1]
-        dstock = self.dSimulationData.stock[self.initialDay:self.initialDay+i+1]
-        roLine.set_data(days, robj)
-        doLine.set_data(days, dobj)
-        rsLine.set_data(days, rstock)
-        dsLine.set_data(days, dstock)
-        return roLine, doLine, rsLine, dsLine
+    # Out of sample evaluation of the plans of both solvers, against sampled demand paths
+    def evaluatePlans(self):
+        evaluator = MonteCarloEvaluator(self.data, initialDay=self.initialDay, finalDay=self.finalDay)
+        evaluator.evaluate({"deterministic": self.dSolver.repositions, "robust": self.rSolver.repositions})
+        evaluator.printResults()
+        evaluator.save(self.getOutputPath() + "evaluation.json")
 
     def printToFile(self, day, realDemand, dObj, dRep, rObj, rRep):
         fileName = ".\\..\\output\\Inventory_u" + str(params.currentUncertainty).replace(".","") + \
@@ -342,8 +235,23 @@ class InventoryPlanner:
         f.write(line)
         f.close()
 
-planner = InventoryPlanner()
-planner.runBatchExperiments()
+
+# Each worker process of the parallel batch run keeps its own planner, so the input data is read once per process
+workerPlanner = None
+
+
+def initWorker():
+    global workerPlanner
+    workerPlanner = InventoryPlanner()
+
+
+def runWorkerExperiment(config):
+    return workerPlanner.runExperiment(config)
+
+
+if __name__ == "__main__":
+    planner = InventoryPlanner()
+    planner.runBatchExperiments()
 
 # fileName = ".\\..\\output\\StockNReposition_u" + str(params.currentUncertainty) + "_r" +\
 #                        str(params.currentRobustness) + "_day" + str(day) + ".csv"
@@ -0,0 +1,70 @@
+import os
+import time
+from src.inputdata.Parameters import Parameters as params
+from src.inputdata.ProblemData import ProblemData
+from src.solvers.DeterministicSolver import DeterministicSolver
+from src.solvers.RobustSolver import RobustSolver
+
+
+# Compares the lp backends on the input data file: model build time, solve time and objective value
+# of the deterministic and robust models for each planning day. Both backends see the same scenarios.
+class BackendBenchmark:
+    def __init__(self, backends=("cplex", "highs"), numDays=5):
+        self.data = ProblemData()
+        self.backends = backends
+        self.numDays = numDays
+        self.results = []  # (backend, model, day, build time, solve time, objective)
+
+    def run(self):
+        self.data.setRepositionDays()
+        self.data.computeForecasts(params.initialDay, params.initialDay + self.numDays)
+
+        for backend in self.backends:
+            params.lpBackend = backend
+            for solver in (DeterministicSolver(self.data), RobustSolver(self.data)):
+                for day in range(params.initialDay, params.initialDay + self.numDays):
+                    self.measure(backend, solver, day)
+
+        return self.results
+
+    def measure(self, backend, solver, day):
+        solver.currentDay = day
+        solver.finalDay = day + params.horizon
+        if isinstance(solver, RobustSolver):
+            solver.createScenarios()
+
+        start = time.time()
+        solver.createLp()
+        buildTime = time.time() - start
+
+        start = time.time()
+        solver.backend.solve()
+        solveTime = time.time() - start
+
+        # keep the solver state (repositions) as in a regular run
+        solver.saveSolution(solver.backend.getValues())
+
+        model = "deterministic" if isinstance(solver, DeterministicSolver) else "robust"
+        self.results.append((backend, model, day, buildTime, solveTime, solver.backend.getObjectiveValue()))
+
+    def printResults(self):
+        print "Backend;Model;Day;Build (s);Solve (s);Objective"
+        for r in self.results:
+            print "%s;%s;%d;%.4f;%.4f;%.2f" % r
+
+    def save(self, filename):
+        if not os.path.exists(os.path.dirname(filename)):
+            os.makedirs(os.path.dirname(filename))
+
+        f = open(filename, "w")
+        f.write("Backend;Model;Day;Build;Solve;Objective\n")
+        for r in self.results:
+            f.write("%s;%s;%d;%.6f;%.6f;%.6f\n" % r)
+        f.close()
+
+
+if __name__ == "__main__":
+    benchmark = BackendBenchmark()
+    benchmark.run()
+    benchmark.printResults()
+    benchmark.save("../output/Benchmarks/backends.csv")
@@ -0,0 +1,195 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import date, timedelta
+import numpy as np
+
+from src.inputdata.Parameters import Parameters as params
+from src.inputdata.ProblemData import ProblemData
+from src.solvers.DeterministicSolver import DeterministicSolver
+from src.solvers.RobustSolver import RobustSolver
+from src.solutiondata.ResultStore import ResultStore
+
+
+# Times each stage of the planning pipeline on its own (data reading, forecasts, scenario generation, lp build,
+# solve and solution extraction of both models, simulation and the result writers/plots), sweeping the horizon,
+# the number of scenarios and the history length one at a time around a base point.
+# Every measure is written as a JSON line, tagged with the code version, to track regressions between versions.
+class PipelineBenchmark:
+    def __init__(self, horizons=(7, 14, 35, 90, 180), scenarios=(10, 100, 1000, 10000),
+                 historyDays=(100, 400, 1000, 5000), base=(35, 100, 400), repeat=1, plotDays=3):
+        self.points = [base]
+        self.points += [(h, base[1], base[2]) for h in horizons]
+        self.points += [(base[0], s, base[2]) for s in scenarios]
+        self.points += [(base[0], base[1], d) for d in historyDays]
+        self.points = sorted(set(self.points), key=self.points.index)
+        self.repeat = repeat  # each stage is run repeat times and the best time is kept
+        self.plotDays = plotDays
+        self.version = self.getVersion()
+        self.results = []  # one dict per (point, stage)
+
+    def run(self):
+        saved = (params.horizon, params.numScenarios, params.dataFile, params.dataCacheDir)
+        self.sales = ProblemData().demand  # repeated to build the history of each point
+        workDir = tempfile.mkdtemp()
+        try:
+            for point in self.points:
+                try:
+                    self.measurePoint(point, workDir)
+                except Exception as e:
+                    # stages past a failure (e.g. a solver size limit) are not measured for this point
+                    self.record(point, "error", 0.0, error=str(e))
+        finally:
+            params.horizon, params.numScenarios, params.dataFile, params.dataCacheDir = saved
+            shutil.rmtree(workDir, True)
+        return self.results
+
+    def measurePoint(self, point, workDir):
+        horizon, numScenarios, historyDays = point
+        if historyDays < params.initialDay + (2 * horizon):
+            return  # not enough days to plan one horizon
+
+        print "Benchmark horizon " + str(horizon) + ", " + str(numScenarios) + " scenarios, " + \
+              str(historyDays) + " days of history"
+        params.horizon = horizon
+        params.numScenarios = numScenarios
+        params.dataFile = self.createDataFile(historyDays, workDir)
+        params.dataCacheDir = None
+        day = params.initialDay
+
+        # input data
+        data = self.measure(point, "readDatafile", ProblemData)
+        params.dataCacheDir = os.path.join(workDir, "cache")
+        ProblemData()  # fills the cache
+        self.measure(point, "readDatafileCached", ProblemData)
+        data.setRepositionDays()
+        self.measure(point, "computeForecasts", data.computeForecasts, day, day + horizon)
+
+        # deterministic model
+        dSolver = DeterministicSolver(data)
+        dSolver.currentDay = day
+        dSolver.finalDay = day + horizon
+        self.measure(point, "deterministicFastSolution", dSolver.computeFastSolution)
+        self.measure(point, "deterministicCreateLp", self.buildLp, dSolver)
+        self.measureSolve(point, "deterministicSolve", dSolver)
+        self.measure(point, "deterministicExtraction", lambda: dSolver.saveSolution(dSolver.backend.getValues()))
+
+        # robust model
+        rSolver = RobustSolver(data)
+        rSolver.currentDay = day
+        rSolver.finalDay = day + horizon
+        self.measure(point, "scenarioGeneration", rSolver.createScenarios)
+        self.measure(point, "robustCreateLp", self.buildLp, rSolver)
+        self.measureSolve(point, "robustSolve", rSolver)
+        self.measure(point, "robustExtraction", lambda: rSolver.saveSolution(rSolver.backend.getValues()))
+
+        # simulation and outputs, from the plans of the first day
+        from src.Main import InventoryPlanner
+        planner = InventoryPlanner()
+        planner.data, planner.dSolver, planner.rSolver = data, dSolver, rSolver
+        self.measure(point, "computeSimulationData", planner.computeSimulationData)
+
+        config = (params.currentUncertainty, params.currentRobustness, params.currentRepositionInterval, params.currentLeadTime)
+        results = ResultStore.create(data, config, day, day + horizon, horizon, (rSolver, dSolver),
+                                     (planner.rSimulationData, planner.dSimulationData))
+        self.measure(point, "saveResults", results.save, os.path.join(workDir, "results.npz"))
+        self.measure(point, "exportCsv", self.exportCsv, results, workDir)
+
+        from src.graphics.GraphPlotter import GraphPlotter
+        plotted = ResultStore.create(data, config, day, day + min(self.plotDays, horizon), horizon, (rSolver, dSolver),
+                                     (planner.rSimulationData, planner.dSimulationData))
+        self.measure(point, "plotDailyGraphs", GraphPlotter().plot, plotted, workDir + os.sep)
+        self.results[-1]["count"] = len(plotted.getDays())
+
+    # Runs function repeat times and records the best time, returns the result of the last run
+    def measure(self, point, stage, function, *args):
+        best = None
+        for i in range(self.repeat):
+            start = time.time()
+            result = function(*args)
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        self.record(point, stage, best)
+        return result
+
+    # Solves the lp of the solver repeat times and records the best time. The lp is rebuilt (not timed) before
+    # every repeat, a solved model would restart from its optimal basis
+    def measureSolve(self, point, stage, solver):
+        best = None
+        for i in range(self.repeat):
+            if i > 0:
+                self.buildLp(solver)
+            start = time.time()
+            solver.backend.solve()
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        self.record(point, stage, best)
+
+    # Builds the lp of the solver from scratch, never the incremental update of the previous model
+    @staticmethod
+    def buildLp(solver):
+        solver.reset()
+        solver.createLp()
+
+    def record(self, point, stage, seconds, error=None):
+        result = {"version": self.version, "stage": stage, "horizon": point[0], "numScenarios": point[1],
+                  "historyDays": point[2], "seconds": seconds}
+        if error is not None:
+            result["error"] = error
+        self.results.append(result)
+
+    def exportCsv(self, results, path):
+        results.exportDailyCsv(path + os.sep)
+        results.exportSimulationCsv(os.path.join(path, "simulation.csv"))
+
+    # Sales file with the given number of days, repeating the demand of the input data file
+    def createDataFile(self, historyDays, workDir):
+        filename = os.path.join(workDir, "history" + str(historyDays) + ".csv")
+        if os.path.exists(filename):
+            return filename
+
+        sales = np.resize(self.sales, historyDays)
+        first = date(2013, 1, 1)
+        lines = ["Store,Date,Sales\n"]
+        for k in range(historyDays):
+            lines.append("1," + (first + timedelta(k)).strftime("%d/%m/%Y") + "," + str(int(sales[k])) + "\n")
+
+        f = open(filename, "w")
+        f.write("".join(lines))
+        f.close()
+        return filename
+
+    @staticmethod
+    def getVersion():
+        try:
+            output = subprocess.check_output(["git", "describe", "--always", "--dirty"], stderr=subprocess.STDOUT)
+            return output.decode().strip()
+        except (OSError, subprocess.CalledProcessError):
+            return "unknown"
+
+    def printResults(self):
+        print "Stage;Horizon;Scenarios;History;Time (s)"
+        for r in self.results:
+            print "%s;%d;%d;%d;%.4f" % (r["stage"], r["horizon"], r["numScenarios"], r["historyDays"], r["seconds"])
+
+    # Appends the results to a JSON lines file
+    def save(self, filename):
+        if not os.path.exists(os.path.dirname(filename)):
+            os.makedirs(os.path.dirname(filename))
+
+        f = open(filename, "a")
+        for r in self.results:
+            f.write(json.dumps(r, sort_keys=True) + "\n")
+        f.close()
+
+
+if __name__ == "__main__":
+    benchmark = PipelineBenchmark()
+    benchmark.run()
+    benchmark.printResults()
+    benchmark.save("../output/Benchmarks/pipeline.jsonl")
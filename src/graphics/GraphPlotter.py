@@ -1,4 +1,87 @@
+import matplotlib
+matplotlib.use("Agg")  # rendering only writes files, it never needs a display
+import matplotlib.pyplot as plt
+import matplotlib.gridspec as gridspec
+from matplotlib.collections import LineCollection
+import numpy as np
+
+
+# Daily result graphs of an experiment, rendered from a ResultStore.
+# The figure and all its artists are created once; for each day only their data, limits and titles are
+# updated (set_data/set_height), instead of clearing the figure and rebuilding the 3x3 axes every day.
 class GraphPlotter:
-    def __init__(self, problem_data, problem_solutions):
-        self.problem_data = problem_data
-        self.problem_solutions = problem_solutions
+
+    panels = (("plannedStocks", "Stock", "b"), ("plannedRepositions", "Reposition", "g"), ("plannedFaults", "Lack", "r"))
+    modelNames = (("robust", "Robust Model"), ("deterministic", "Deterministic Model"))
+
+    def __init__(self):
+        self.fig = None
+        self.horizon = 0
+        self.bars = []
+
+    def createFigure(self, horizon):
+        if self.fig is not None:
+            plt.close(self.fig)
+
+        matplotlib.rcParams.update({'font.size': 10})
+        self.fig = plt.figure()
+        self.horizon = horizon
+        self.title = self.fig.suptitle("", size=13)
+        gs = gridspec.GridSpec(3, 3, hspace=0.9, wspace=0.5)
+        k = np.arange(horizon)
+        zeros = np.zeros(horizon)
+
+        # Demand data result
+        self.demandAxes = self.fig.add_subplot(gs[0, :])
+        self.forecastLine, = self.demandAxes.plot(k, zeros, label="Forecast Demand")
+        self.demandLine, = self.demandAxes.plot(k, zeros, label="Real Demand")
+        self.forecastMarkers, = self.demandAxes.plot(k, zeros, "o", color=self.forecastLine.get_color())
+        self.errorBars = LineCollection([], colors=self.forecastLine.get_color())
+        self.demandAxes.add_collection(self.errorBars)
+        self.demandAxes.legend(loc='upper center', bbox_to_anchor=(0.5, 1.3), ncol=2, fancybox=True, shadow=True)
+
+        # Stock, reposition and lack of each model (robust on the second row, deterministic on the third)
+        self.bars = []
+        for row, (model, name) in enumerate(self.modelNames):
+            for col, (field, title, color) in enumerate(self.panels):
+                ax = self.fig.add_subplot(gs[row + 1, col])
+                ax.set_title(title, size=12)
+                if col == 1:
+                    ax.text(0.5, 1.45, name, size=13, transform=ax.transAxes, horizontalalignment='center',
+                            verticalalignment='top', multialignment='center')
+                self.bars.append((model, field, ax, ax.bar(k, zeros, align="center", color=color)))
+
+    def plotDay(self, results, day):
+        days = results.getHorizonDays(day)
+        demand = results.getDemand(day)
+        forecast = results.getForecast(day)
+        error = results.getError(day)
+
+        self.title.set_text('Results for Day ' + str(day) + " | Error: {:g} | Robustness: {:g} | RepInterval: {:d}"
+                            " | LeadTime: {:d}".format(*results.getConfig()))
+
+        self.forecastLine.set_data(days, forecast)
+        self.forecastMarkers.set_data(days, forecast)
+        self.demandLine.set_data(days, demand)
+        self.errorBars.set_segments(np.dstack((np.column_stack((days, days)),
+                                               np.column_stack((forecast - error, forecast + error)))))
+        self.demandAxes.set_xlim(day, day + self.horizon)
+        self.demandAxes.set_ylim(0, error.max() + forecast.max() + 2000)
+
+        for model, field, ax, bars in self.bars:
+            values = results.getPlanned(model, field, day)
+            for rect, x, value in zip(bars, days, values):
+                rect.set_x(x - (rect.get_width() / 2.))
+                rect.set_height(value)
+            ax.set_xlim(day - 1, day + self.horizon)
+            ax.set_ylim(0, values.max() + 10000)
+
+    # Renders the graph of every planning day of results as <path>Graph_Day<day>.png
+    def plot(self, results, path):
+        horizon = len(results.getHorizonDays(0))
+        if self.fig is None or horizon != self.horizon:
+            self.createFigure(horizon)
+
+        for day in results.getDays():
+            self.plotDay(results, day)
+            self.fig.savefig(path + "Graph_Day" + str(day) + ".png", dpi=150, facecolor='white')
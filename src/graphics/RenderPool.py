@@ -0,0 +1,75 @@
+import os
+import multiprocessing
+from src.solutiondata.ResultStore import ResultStore
+
+
+# Rendering stage of the batch run: renders the daily graphs (<path>DailyGraphs/) and the simulation output
+# (<path>Simulation/, see SimulationAnimator) of finished experiments, from their results.npz, in a pool of
+# worker processes, so the planner can go on solving the next experiments meanwhile.
+# With numWorkers = 0 the graphs are rendered right away in the calling process.
+# An experiment can be submitted with a stamp (what its outputs are rendered from, e.g. the ResultCache key), kept
+# in <path>rendered.stamp once the rendering is finished, so outputs that are up to date are not rendered again.
+class RenderPool:
+    stampFile = "rendered.stamp"
+
+    def __init__(self, numWorkers=1):
+        self.numWorkers = numWorkers
+        self.pool = None
+        self.pending = []
+        if numWorkers > 0:
+            self.pool = multiprocessing.Pool(numWorkers)
+
+    # dailyGraphs: False to only render the simulation output
+    def submit(self, resultsFile, path, animationMode="off", stamp=0, dailyGraphs=True):
+        if self.pool is None:
+            renderResults(resultsFile, path, animationMode, stamp, dailyGraphs)
+        else:
+            self.pending.append(self.pool.apply_async(renderResults,
+                                                      (resultsFile, path, animationMode, stamp, dailyGraphs)))
+
+    # True if the outputs in path were rendered with the given stamp
+    @staticmethod
+    def isRendered(path, stamp):
+        if stamp == 0 or not os.path.exists(path + RenderPool.stampFile):
+            return False
+        f = open(path + RenderPool.stampFile)
+        rendered = f.read()
+        f.close()
+        return rendered == stamp
+
+    # Waits for every submitted experiment, raising the first rendering error
+    def close(self):
+        if self.pool is None:
+            return
+        self.pool.close()
+        try:
+            for result in self.pending:
+                result.get()
+        finally:
+            self.pool.join()
+            self.pending = []
+
+
+# Every rendering process keeps its own plotter, so the figure is reused across experiments
+workerPlotter = None
+
+
+def renderResults(resultsFile, path, animationMode, stamp=0, dailyGraphs=True):
+    global workerPlotter
+    if os.path.exists(path + RenderPool.stampFile):
+        os.remove(path + RenderPool.stampFile)
+
+    results = ResultStore.load(resultsFile)
+    if dailyGraphs:
+        if workerPlotter is None:
+            from src.graphics.GraphPlotter import GraphPlotter
+            workerPlotter = GraphPlotter()
+        workerPlotter.plot(results, path + "DailyGraphs/")
+    if animationMode != "off":
+        from src.graphics.SimulationAnimator import SimulationAnimator
+        SimulationAnimator().save(results, path + "Simulation/", animationMode)
+
+    if stamp != 0:
+        f = open(path + RenderPool.stampFile, "w")
+        f.write(stamp)
+        f.close()
@@ -0,0 +1,101 @@
+import os
+import sys
+import matplotlib
+matplotlib.use("Agg")  # rendering only writes files, it never needs a display
+import matplotlib.pyplot as plt
+import matplotlib.gridspec as gridspec
+import matplotlib.animation as animation
+from matplotlib.font_manager import FontProperties
+
+from src.solutiondata.ResultStore import ResultStore
+
+
+# Simulation output of an experiment (objective and stock of both models along the planning days), rendered
+# on demand from its ResultStore. The cheap default is a single static summary figure; the MP4 video is only
+# encoded when asked for, with blitted frames, and falls back to the summary if ffmpeg is not installed.
+class SimulationAnimator:
+
+    series = (("robust", "obj", "r", "Robust Obj"), ("deterministic", "obj", "b", "Deterministic Obj"),
+              ("robust", "stock", "r", "Robust Stock"), ("deterministic", "stock", "b", "Deterministic Stock"))
+
+    def __init__(self, fps=1, bitrate=1800):
+        self.fps = fps
+        self.bitrate = bitrate
+
+    def createFigure(self, results):
+        fontP = FontProperties()
+        fontP.set_size('small')
+        days = results.getDays()
+
+        fig = plt.figure()
+        fig.suptitle("Simulation | Error: {:g} | Robustness: {:g} | RepInterval: {:d} | LeadTime: {:d}".format(
+                     *results.getConfig()), size=13)
+        gs = gridspec.GridSpec(2, 1, hspace=0.3, wspace=0.5)
+
+        # Obj Functions
+        ax1 = fig.add_subplot(gs[0, 0])
+        ax1.set_ylim(0, max(results.getSimulation(m, "obj").max() for m in ResultStore.models) + 100000)
+
+        # Stocks
+        ax2 = fig.add_subplot(gs[1, 0])
+        ax2.set_title("Stocks")
+        ax2.set_ylim(0, max(results.getSimulation(m, "stock").max() for m in ResultStore.models) + 10000)
+
+        lines = []
+        for ax, series in ((ax1, self.series[:2]), (ax2, self.series[2:])):
+            ax.set_xlim(days[0], days[0] + len(days))
+            for model, field, color, label in series:
+                line, = ax.plot([], [], color, label=label)
+                lines.append(line)
+            ax.legend(loc='upper center', bbox_to_anchor=(0.5, 1.15), ncol=2, fancybox=True, shadow=True, prop=fontP)
+
+        return fig, lines
+
+    # Shows the first count days of every series
+    def updateLines(self, count, results, lines):
+        days = results.getDays()[:count]
+        for line, (model, field, color, label) in zip(lines, self.series):
+            line.set_data(days, results.getSimulation(model, field)[:count])
+        return lines
+
+    def saveSummary(self, results, filename):
+        fig, lines = self.createFigure(results)
+        self.updateLines(len(results.getDays()), results, lines)
+        fig.savefig(filename, dpi=150, facecolor='white')
+        plt.close(fig)
+
+    def saveVideo(self, results, filename):
+        fig, lines = self.createFigure(results)
+        writer = animation.writers['ffmpeg'](fps=self.fps, metadata=dict(artist='Fabian'), bitrate=self.bitrate)
+
+        # only the lines are redrawn on each frame (blit), the axes are drawn once
+        frames = range(1, len(results.getDays()) + 1)
+        lineAnimation = animation.FuncAnimation(fig, self.updateLines, frames=frames, fargs=(results, lines),
+                                                init_func=lambda: self.updateLines(0, results, lines),
+                                                interval=1000, blit=True)
+        lineAnimation.save(filename, writer=writer, savefig_kwargs={'facecolor':'white'})
+        plt.close(fig)
+
+    @staticmethod
+    def isVideoAvailable():
+        return animation.writers.is_available('ffmpeg')
+
+    # Saves <path>simulation.png ("summary") or <path>simulation.mp4 ("video"), returns the file written
+    def save(self, results, path, mode="summary"):
+        if mode == "video":
+            if self.isVideoAvailable():
+                self.saveVideo(results, path + "simulation.mp4")
+                return path + "simulation.mp4"
+            print "ffmpeg is not available, saving the simulation summary instead of the video"
+
+        self.saveSummary(results, path + "simulation.png")
+        return path + "simulation.png"
+
+
+# On demand rendering of a stored experiment: SimulationAnimator.py <results.npz> [summary|video]
+if __name__ == "__main__":
+    resultsFile = sys.argv[1]
+    path = os.path.join(os.path.dirname(resultsFile), "Simulation", "")
+    if not os.path.exists(path):
+        os.makedirs(path)
+    print "Saved " + SimulationAnimator().save(ResultStore.load(resultsFile), path, sys.argv[2] if len(sys.argv) > 2 else "summary")
@@ -0,0 +1,89 @@
+import csv
+import hashlib
+import os
+import numpy as np
+from datetime import datetime
+
+
+# Reads the Store, Date and Sales columns of a (Rossmann style) sales file into typed arrays.
+# The parsed arrays are cached as a single memory mappable .npy file, keyed by the path, modification time
+# and size of the csv, so repeated runs skip the parsing. Dates may be "dd/mm/yyyy" or "yyyy-mm-dd".
+class DemandLoader:
+
+    dtype = np.dtype([("store", np.int32), ("date", "datetime64[D]"), ("sales", np.float64)])
+
+    def __init__(self, filename, cacheDir=None):
+        self.filename = filename
+        self.cacheDir = cacheDir
+
+    # Structured array (store, date, sales) sorted by store and date
+    def load(self):
+        cacheFile = self.getCacheFile()
+        if cacheFile is not None and os.path.exists(cacheFile):
+            return np.load(cacheFile, mmap_mode="r")
+
+        rows = self.parse()
+        if cacheFile is not None:
+            self.saveCache(rows, cacheFile)
+        return rows
+
+    def getCacheFile(self):
+        if self.cacheDir is None:
+            return None
+        status = os.stat(self.filename)
+        key = "%s|%d|%d" % (os.path.abspath(self.filename), int(status.st_mtime), status.st_size)
+        name = os.path.splitext(os.path.basename(self.filename))[0]
+        return os.path.join(self.cacheDir, name + "_" + hashlib.md5(key.encode("utf-8")).hexdigest() + ".npy")
+
+    def saveCache(self, rows, cacheFile):
+        if not os.path.exists(self.cacheDir):
+            os.makedirs(self.cacheDir)
+
+        # write and rename, so a concurrent run never maps a half written cache
+        tmpFile = cacheFile + "." + str(os.getpid()) + ".tmp"
+        np.save(tmpFile, rows)
+        try:
+            os.rename(tmpFile + ".npy", cacheFile)
+        except OSError:
+            os.remove(tmpFile + ".npy")  # another run created the cache first
+
+    def parse(self):
+        with open(self.filename) as csvfile:
+            lines = csvfile.read().splitlines()
+        header = [h.strip() for h in lines[0].split(",")]
+        columns = [header.index(c) for c in ("Store", "Date", "Sales")]
+        lines = [l for l in lines[1:] if len(l) > 0]
+
+        # one split of the whole body, each column is then a strided slice of the fields
+        fields = ",".join(lines).split(",")
+        if len(fields) == len(lines) * len(header):
+            table = [fields[c::len(header)] for c in columns]
+        else:
+            # quoted fields with commas, use the csv module
+            table = list(zip(*[[r[c] for c in columns] for r in csv.reader(lines)]))
+
+        rows = np.empty(len(lines), dtype=self.dtype)
+        rows["store"] = np.array(table[0]).astype(np.int32)
+        rows["date"] = self.parseDates(np.array(table[1]))
+        rows["sales"] = np.array(table[2]).astype(np.float64)
+
+        # stable sort, rows of the same day keep the file order
+        return rows[np.lexsort((rows["date"], rows["store"]))]
+
+    @staticmethod
+    def parseDates(dates):
+        dates = np.char.strip(np.asarray(dates).astype("S10")).astype("S10")
+        if len(dates) == 0 or dates[0][4:5] == b"-":
+            return dates.astype("datetime64[D]")
+        if np.char.str_len(dates).min() < 10:
+            # not zero padded, parsed one by one
+            return np.array([datetime.strptime(d.decode(), "%d/%m/%Y") for d in dates], dtype="datetime64[D]")
+
+        # dd/mm/yyyy: the digits are read straight from the bytes of the fixed width strings
+        digits = dates.view(np.uint8).reshape(-1, 10).astype(np.int64) - ord("0")
+        day = (digits[:, 0] * 10) + digits[:, 1]
+        month = (digits[:, 3] * 10) + digits[:, 4]
+        year = (digits[:, 6] * 1000) + (digits[:, 7] * 100) + (digits[:, 8] * 10) + digits[:, 9]
+
+        months = ((year - 1970) * 12) + (month - 1)
+        return months.astype("datetime64[M]").astype("datetime64[D]") + (day - 1).astype("timedelta64[D]")
@@ -0,0 +1,32 @@
+from collections import namedtuple
+from Parameters import Parameters as params
+from RandomStreams import RandomStreams
+
+
+# Immutable configuration of one experiment (one point of the experiment grid)
+class ExperimentConfig(namedtuple("ExperimentConfig", ["uncertainty", "robustness", "repositionInterval",
+                                                       "leadTime", "seed"])):
+    __slots__ = ()
+
+    # Copies the configuration to the current* parameters read by the solvers. Each worker process
+    # has its own copy of Parameters, so this never leaks into other experiments running in parallel.
+    def apply(self):
+        params.currentUncertainty = self.uncertainty
+        params.currentRobustness = self.robustness
+        params.currentRepositionInterval = self.repositionInterval
+        params.currentLeadTime = self.leadTime
+
+    # Random generators of the experiment, derived from its seed and values (not from its position in the grid)
+    def getStreams(self):
+        return RandomStreams(self.seed, (self.uncertainty, self.robustness, self.repositionInterval, self.leadTime))
+
+    # Experiment grid, in the same order as the serial batch run
+    @staticmethod
+    def createGrid():
+        grid = []
+        for u in params.uncertainties:
+            for r in params.robustness:
+                for ri in params.repositionIntervals:
+                    for lt in params.leadTimes:
+                        grid.append(ExperimentConfig(u, r, ri, lt, params.seed))
+        return grid
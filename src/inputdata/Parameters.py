@@ -1,3 +1,6 @@
+import os
+
+
 class Parameters:
     initialDay = 0  # initial planning day (t0) (leave at 0 for now, current input contains 61 days)
     horizon = 35  # number of days in planning horizon (maximum 30 days for now, current input contains 61 days)
@@ -11,6 +14,12 @@ class Parameters:
 
     # other stuff
     numScenarios = 100 # number of different demand scenarios to be considered on each robust optimization day
+    reducedScenarios = 0  # scenarios kept after scenario reduction (0 = no reduction)
+    scenarioReduction = "fastforward"  # reduction method: "fastforward" or "kmedoids"
+    lazyScenarios = False  # add scenarios to the robust lp only when the plan violates them
+    lazyInitialScenarios = 4  # scenarios in the first lazy iteration
+    lazyScenariosPerIteration = 4  # most violated scenarios added on each lazy iteration
+    keepScenarioPlans = False  # keep the stocks/faults of every robust scenario of each day (RobustSolver.scenarioPlans)
     repositionInterval = 3
     leadTime = 5
     robustInterval = 7
@@ -19,11 +28,54 @@ class Parameters:
     currentUncertainty = 0.8
     currentRobustness = 1
 
+    # input data
+    dataFile = os.path.join("..", "data", "data_mid.csv")  # sales csv with (at least) Store, Date and Sales columns
+    dataCacheDir = os.path.join("..", "data", "cache")  # parsed data cache (None = always parse the csv)
+    store = None  # store to plan (None = first store of the file)
+
+    # solver settings
+    lpBackend = "cplex"  # lp engine: "cplex" or "highs" (scipy linprog: HiGHS, interior point on python 2's scipy)
+    # build the lps from arrays in a few bulk calls (False: one call per variable/row, cplex only, the other
+    # backends always build in bulk)
+    bulkModelBuild = True
+    deterministicMode = "fast"  # "fast": lot sizing algorithm, "lp": lp backend, "check": lp checked against "fast"
+    incrementalModel = False  # keep the lps alive between planning days, shifting bounds/rhs, previous basis as start
+    lpExportMode = "off"  # lp model export: "off", "interval" (every lpExportInterval days) or "failures"
+    lpExportInterval = 1
+    lpExportDir = "../lps"
+
+    # output settings
+    plotMode = "pool"  # daily graphs: "pool" (rendered by renderWorkers processes while solving), "inline" or "off"
+    renderWorkers = 1
+    # rendered even with plotMode "off" (by the render pool, inline with plotMode "inline")
+    animationMode = "off"  # simulation output: "off", "summary" (static png) or "video" (mp4, needs ffmpeg)
+    instrumentation = False  # per phase timings, model sizes and memory of every solve as JSON lines
+    instrumentationFile = os.path.join("..", "output", "metrics.jsonl")
+    exportCsv = False  # also write the results as ";" separated CSV files (they are always kept in results.npz)
+
+    # out of sample evaluation of the plans (MonteCarloEvaluator), the demand error of each day grows with
+    # sqrt(t - t0) from the first planning day, as the forecast error
+    monteCarloPaths = 0  # demand paths the plans of each experiment are simulated against (0 = off)
+    monteCarloChunk = 1000  # paths simulated at once
+    monteCarloQuantiles = [0.05, 0.25, 0.5, 0.75, 0.95]
+    cvarLevel = 0.05  # fraction of the worst paths averaged by the CVaR
+
+    # experiment result cache (ResultCache)
+    resultCache = False  # load the experiments already run (same configuration, seed, data and solver) from the cache
+    resultCacheDir = os.path.join("..", "output", "cache")
+    resultCacheSize = 2048  # MB, the least recently used experiments are evicted past it
+
+    # checkpoints of the batch runs (Checkpoint)
+    checkpointInterval = 0  # planning days between the checkpoints of each experiment (0 = off)
+    resume = False  # continue each experiment from its last checkpoint (finished experiments are not planned again)
+
     # Experiments data
     uncertainties = [0.3,0.4,0.5]
     robustness = [1,2,3]
     leadTimes = [3,4,5]
     repositionIntervals = [3,5]
+    seed = 0  # base seed of the random streams of every experiment (see RandomStreams)
+    numWorkers = 1  # number of processes used to run the experiment grid (1 = serial)
 
 
 
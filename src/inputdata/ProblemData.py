@@ -1,75 +1,78 @@
-import csv
 import math
 import numpy as np
 from Parameters import Parameters as params
-from DemandData import DemandData
-from datetime import datetime
+from DemandLoader import DemandLoader
+from RandomStreams import RandomStreams
 
 
 class ProblemData:
-    # Constructor
-    def __init__(self):
-        self.demandDataList = []
+    # Constructor (rows: the already loaded input data, see DemandLoader, so many stores share one load)
+    def __init__(self, store=None, rows=None):
         self.maxDemand = 0.0
         self.repositionDays = []
-        self.readDatafile()
-        self.forecast = [[0 for i in range(len(self.demandDataList))] for j in range(len(self.demandDataList))]
-
-    # Reads data file
-    def readDatafile(self):
-        print "Reading input data..."
-        with open('.\\..\\data\\data_mid.csv') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for r in reader:
-                date = datetime.strptime(r["Date"], "%d/%m/%Y")
-                demand = float(r["Sales"])
-                self.maxDemand = max(self.maxDemand, demand)
-                self.demandDataList.append(DemandData(date, demand))
-
-        # Sort the data by date
-        self.demandDataList.sort(key=lambda d: d.date)
+        self.store = params.store if store is None else store
+        self.dates = np.zeros(0, dtype="datetime64[D]")
+        self.demand = np.zeros(0)
+        self.readDatafile(rows)
+
+        # forecast band: forecast[t0, k] is the forecast made on day t0 for day t0 + k (k < horizon)
+        self.forecast = np.zeros((self.numDays, params.horizon))
+
+    # Reads data file, keeping the days (sorted by date) of one store
+    def readDatafile(self, rows=None):
+        if rows is None:
+            print "Reading input data..."
+            rows = DemandLoader(params.dataFile, params.dataCacheDir).load()
+
+        if self.store is None:
+            self.store = int(rows["store"][0]) if len(rows) > 0 else 0
+        first, last = np.searchsorted(rows["store"], [self.store, self.store + 1])
+
+        self.dates = np.array(rows["date"][first:last])
+        self.demand = np.array(rows["sales"][first:last], dtype=float)
+        self.numDays = len(self.demand)
+        self.maxDemand = self.demand.max() if self.numDays > 0 else 0.0
 
     # Returns the stock to be considered at the begining of the scenario
     def getInitialStock(self):
-        totalStock = 0
         initDay = params.initialDay
         lastDay = initDay + params.initialStockDays
 
-        for i in range(initDay, lastDay):
-            totalStock += self.demandDataList[i].demand
-
-        return totalStock
+        return self.demand[initDay:lastDay].sum()
 
     def setRepositionDays(self, days=[]):
         if len(days) > 0:
             self.repositionDays = days
             return
 
-        for i in range(params.initialDay, len(self.demandDataList), params.currentRepositionInterval):
+        self.repositionDays = []
+        for i in range(params.initialDay, self.numDays, params.currentRepositionInterval):
             self.repositionDays.append(i)
 
-    def computeForecast(self, t0):
-        t = t0
-        for d in self.demandDataList[t0:]:
-            # get the real demand
-            realDemand = d.demand
+    def computeForecast(self, t0, streams=None):
+        self.computeForecasts(t0, t0 + 1, streams)
 
-            # get error interval
-            uncertainty = self.getCurrentUncertaintyInterval(t0,t)
+    # Computes the forecast band of every planning day in [firstDay, lastDay) at once, the error of each day
+    # is drawn from its own forecast stream (see RandomStreams)
+    def computeForecasts(self, firstDay, lastDay, streams=None):
+        streams = RandomStreams() if streams is None else streams
+        offsets = np.arange(params.horizon)
+        days = np.arange(firstDay, lastDay)[:, np.newaxis] + offsets
 
-            # raffle a demand error inside the error interval
-            error = 0
-            if uncertainty > 0:
-                error = np.random.uniform(-2*uncertainty, 2*uncertainty)
+        # get the real demand (days past the end of the data have no forecast)
+        valid = days < len(self.demand)
+        realDemand = np.where(valid, self.demand[np.minimum(days, len(self.demand) - 1)], 0.0)
 
-            # compute the demand forecast for t on this iteration (day)
-            fDemand = realDemand * (1 + (error/5))
-            self.forecast[t0][t] = fDemand
+        # raffle a demand error inside the error interval, which grows with sqrt(t-t0)
+        uncertainty = params.currentUncertainty * np.sqrt(offsets)
+        draws = [streams.get("forecast", t0).uniform(-2, 2, params.horizon) for t0 in range(firstDay, lastDay)]
+        error = np.array(draws).reshape(days.shape) * uncertainty
 
-            t += 1
+        # compute the demand forecast for each t of each planning day
+        self.forecast[firstDay:lastDay] = realDemand * (1 + (error/5))
 
     def getForecast(self, t0, t):
-        return self.forecast[t0][t]
+        return self.forecast[t0, t - t0]
 
     def getCurrentUncertaintyInterval(self, t0, t):
         return float(params.currentUncertainty * math.sqrt(t-t0))
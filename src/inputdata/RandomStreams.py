@@ -0,0 +1,32 @@
+import hashlib
+import json
+import numpy as np
+from Parameters import Parameters as params
+
+
+# Independent random generators for each experiment, planning day and stream (forecast error, scenario y,
+# evaluation paths), so the random numbers of an experiment do not depend on the experiments or days that ran
+# before it: results are the same whatever the execution order, the number of workers or the part of the grid
+# that is run.
+# numpy < 1.17 has no SeedSequence, so every generator is a RandomState seeded with an array of words (the base
+# seed, a stable hash of the experiment values, the stream and the day), which init_by_array mixes into
+# unrelated states.
+class RandomStreams:
+    streams = {"forecast": 1, "scenarios": 2, "evaluation": 3}
+
+    # experiment: tuple of values that identify the experiment, by default the current configuration
+    # (uncertainty, robustness, reposition interval, lead time)
+    def __init__(self, seed=None, experiment=None):
+        self.seed = params.seed if seed is None else seed
+        self.experiment = RandomStreams.getCurrentExperiment() if experiment is None else tuple(experiment)
+        digest = hashlib.md5(json.dumps(list(self.experiment)).encode("utf-8")).hexdigest()
+        self.words = [int(self.seed) & 0xffffffff, int(digest[:8], 16), int(digest[8:16], 16)]
+
+    @staticmethod
+    def getCurrentExperiment():
+        return (params.currentUncertainty, params.currentRobustness, params.currentRepositionInterval,
+                params.currentLeadTime)
+
+    # Generator of a stream for a planning day (day is not used by the streams that are not per day)
+    def get(self, stream, day=0):
+        return np.random.RandomState(self.words + [self.streams[stream], int(day)])
@@ -0,0 +1,88 @@
+from Parameters import Parameters as params
+import numpy as np
+
+
+# Shrinks a ScenarioSet to a small representative set before the robust lp is built.
+# Scenarios are compared by the euclidean distance between their forecast rows. The reduction error is the
+# Kantorovich distance between the original and the reduced set: the probability weighted distance of every
+# scenario to the scenario that represents it.
+class ScenarioReducer:
+    def __init__(self, numScenarios=None, method=None, maxIterations=20, chunkSize=512):
+        self.numScenarios = params.reducedScenarios if numScenarios is None else numScenarios
+        self.method = params.scenarioReduction if method is None else method
+        self.maxIterations = maxIterations  # k-medoids only
+        self.chunkSize = chunkSize  # candidate columns evaluated at once, bounds the temporary memory
+        self.error = 0.0
+
+    def reduce(self, scenarios):
+        distances = self.computeDistances(scenarios.forecast)
+        probabilities = scenarios.probabilities
+
+        if self.method == "fastforward":
+            selected = self.fastForwardSelection(distances, probabilities)
+        elif self.method == "kmedoids":
+            selected = self.kMedoids(distances, probabilities)
+        else:
+            raise ValueError("Unknown scenario reduction method: " + str(self.method))
+
+        # the probability of each removed scenario goes to its closest selected one
+        closest = np.argmin(distances[:, selected], axis=1)
+        reducedProbabilities = np.bincount(closest, weights=probabilities, minlength=len(selected))
+        self.error = float(np.dot(probabilities, distances[np.arange(len(closest)), selected[closest]]))
+
+        return scenarios.subset(selected, reducedProbabilities)
+
+    def computeDistances(self, forecast):
+        # |a-b|^2 = |a|^2 + |b|^2 - 2ab, computed in blocks of chunkSize rows so the only (scenarios x scenarios)
+        # matrix is the float32 result (5000 scenarios: 100MB, plus 20MB float64 temporaries per block).
+        # The rounding can leave small negative values and a non zero diagonal, which are clipped
+        n = len(forecast)
+        squares = (forecast ** 2).sum(axis=1)
+        distances = np.empty((n, n), dtype=np.float32)
+        for c in range(0, n, self.chunkSize):
+            block = squares[c:c+self.chunkSize, np.newaxis] + squares[np.newaxis, :] - \
+                    (2 * np.dot(forecast[c:c+self.chunkSize], forecast.T))
+            distances[c:c+self.chunkSize] = np.sqrt(np.maximum(block, 0))
+        np.fill_diagonal(distances, 0)
+        return distances
+
+    # Fast forward selection (Heitsch and Romisch): adds, one at a time, the scenario that most reduces
+    # the distance between the original set and the selected one
+    def fastForwardSelection(self, distances, probabilities):
+        n = len(probabilities)
+        weights = probabilities.astype(np.float32)[:, np.newaxis]
+        closest = np.full(n, np.inf, dtype=np.float32)  # distance of each scenario to the selected set
+        selected = []
+
+        for i in range(min(self.numScenarios, n)):
+            costs = np.empty(n)
+            for c in range(0, n, self.chunkSize):
+                block = np.minimum(closest[:, np.newaxis], distances[:, c:c+self.chunkSize])
+                costs[c:c+self.chunkSize] = (weights * block).sum(axis=0)
+            costs[selected] = np.inf
+
+            u = int(np.argmin(costs))
+            selected.append(u)
+            closest = np.minimum(closest, distances[:, u])
+
+        return np.array(selected, dtype=int)
+
+    # Weighted k-medoids (alternating), starting from the fast forward selection
+    def kMedoids(self, distances, probabilities):
+        medoids = self.fastForwardSelection(distances, probabilities)
+
+        for i in range(self.maxIterations):
+            cluster = np.argmin(distances[:, medoids], axis=1)
+            newMedoids = medoids.copy()
+            for c in range(len(medoids)):
+                members = np.flatnonzero(cluster == c)
+                if len(members) == 0:
+                    continue  # a duplicate of another medoid, whose members all went to the other one
+                costs = np.dot(probabilities[members], distances[np.ix_(members, members)])
+                newMedoids[c] = members[np.argmin(costs)]
+
+            if np.array_equal(newMedoids, medoids):
+                break
+            medoids = newMedoids
+
+        return medoids
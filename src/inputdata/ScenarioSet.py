@@ -0,0 +1,74 @@
+from Parameters import Parameters as params
+import numpy as np
+
+
+# All the demand scenarios of a planning day, kept as (numScenarios, horizon) arrays.
+# Column k of y and forecast refers to day currentDay + k.
+# The y values are drawn from rng (a RandomState, see RandomStreams), by default the global numpy generator.
+class ScenarioSet:
+    def __init__(self, data, day, numScenarios=None, generate=True, rng=None):
+        self.currentDay = day
+        self.rng = np.random if rng is None else rng
+        self.pData = data
+        self.numScenarios = params.numScenarios if numScenarios is None else numScenarios
+        self.horizon = params.horizon
+        self.ids = [str(s) for s in range(self.numScenarios)]
+        self.probabilities = np.full(self.numScenarios, 1.0 / max(1, self.numScenarios))
+        self.y = np.zeros((self.numScenarios, self.horizon))
+        self.forecast = np.zeros((self.numScenarios, self.horizon))
+        self.maxForecast = 0
+        if generate:
+            self.generate()
+
+    def __len__(self):
+        return self.numScenarios
+
+    def computeY(self):
+        # For each day of each period, calculate y
+        # The sum of the absolute y values for a given period must be equal to the robustness parameter.
+        # Whole periods are drawn (also past the horizon) so the last one is normalized as a full interval.
+        totalPeriods = int(np.ceil(float(self.horizon) / params.robustInterval))
+        y = self.rng.uniform(-1, 1, (self.numScenarios, totalPeriods, params.robustInterval))
+        y *= params.currentRobustness / np.abs(y).sum(axis=2)[:, :, np.newaxis]
+        self.y = y.reshape(self.numScenarios, totalPeriods * params.robustInterval)[:, :self.horizon]
+
+    def computeForecast(self):
+        t0 = self.currentDay
+        days = np.arange(t0, t0 + self.horizon)
+
+        # demand forecast and error interval for each day of the horizon
+        demandForecast = np.array([self.pData.getForecast(t0, t) for t in days], dtype=float)
+        errorInterval = params.currentUncertainty * np.sqrt(days - t0)
+
+        # forecast for each scenario and day
+        deviation = demandForecast * (errorInterval / 5)
+        self.forecast = np.maximum(0, demandForecast + (deviation * self.y))
+        self.maxForecast = max(0, self.forecast.max())
+
+    def generate(self):
+        # compute the y matrix for the associated day, one row per scenario
+        self.computeY()
+
+        # using the computed y matrix calculate the demand forecast
+        self.computeForecast()
+
+    # Forecast of scenario s for day t
+    def getForecast(self, s, t):
+        return self.forecast[s, t - self.currentDay]
+
+    # Forecast row (all the horizon) of scenario s
+    def getScenario(self, s):
+        return self.forecast[s]
+
+    # New set with the given scenarios (rows), which keep their ids
+    def subset(self, indices, probabilities=None):
+        indices = np.asarray(indices, dtype=int)
+        scenarios = ScenarioSet(self.pData, self.currentDay, len(indices), generate=False)
+        scenarios.ids = [self.ids[i] for i in indices]
+        scenarios.y = self.y[indices]
+        scenarios.forecast = self.forecast[indices]
+        scenarios.maxForecast = max(0, scenarios.forecast.max()) if len(indices) > 0 else 0
+        if probabilities is None:
+            probabilities = self.probabilities[indices] / self.probabilities[indices].sum()
+        scenarios.probabilities = np.asarray(probabilities, dtype=float)
+        return scenarios
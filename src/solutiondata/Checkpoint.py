@@ -0,0 +1,36 @@
+import os
+import pickle
+
+
+# Planning state of an experiment, saved every few planning days so a long run can be resumed
+# (Parameters.checkpointInterval and Parameters.resume, see InventoryPlanner.executePlanning).
+# The state is written to a temporary file and renamed, so a crash while saving keeps the previous checkpoint.
+class Checkpoint:
+    @staticmethod
+    def save(filename, state):
+        tmpFile = filename + "." + str(os.getpid()) + ".tmp"
+        f = open(tmpFile, "wb")
+        pickle.dump(state, f, pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+
+        try:
+            os.rename(tmpFile, filename)
+        except OSError:
+            # windows does not replace an existing file
+            os.remove(filename)
+            os.rename(tmpFile, filename)
+
+    # The saved state, None if there is no (readable) checkpoint
+    @staticmethod
+    def load(filename):
+        if not os.path.exists(filename):
+            return None
+        f = open(filename, "rb")
+        try:
+            return pickle.load(f)
+        except (EOFError, pickle.UnpicklingError):
+            return None
+        finally:
+            f.close()
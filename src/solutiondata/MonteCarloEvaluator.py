@@ -0,0 +1,83 @@
+import json
+import numpy as np
+from src.inputdata.Parameters import Parameters as params
+from src.inputdata.RandomStreams import RandomStreams
+from SimulationEngine import SimulationEngine
+
+
+# Out of sample evaluation of reposition plans: every plan is simulated (SimulationEngine) against many demand
+# paths drawn from the forecast error model of ProblemData.computeForecasts, instead of the single realized path.
+# The demand of each simulated day t is d_t * (1 + e/5), e uniform in +-2 * uncertainty * sqrt(t - t0), clipped at
+# 0, the error interval that grows with sqrt(t-t0) of the forecasts, where t0 is the day the plans are decided
+# (by default the first simulated day).
+# Paths are drawn and simulated in chunks of (paths x simulated days) to bound the memory, all the plans are
+# evaluated on the same paths. Only the profit, faults and stock-out days of each path are kept.
+class MonteCarloEvaluator:
+    statistics = ("profit", "faults", "stockoutDays")
+
+    def __init__(self, data, numPaths=None, chunkSize=None, initialDay=None, finalDay=None, decisionDay=None,
+                 rng=None):
+        self.data = data
+        self.numPaths = params.monteCarloPaths if numPaths is None else numPaths
+        self.chunkSize = params.monteCarloChunk if chunkSize is None else chunkSize
+        self.initialDay = params.initialDay if initialDay is None else initialDay
+        self.finalDay = self.initialDay + params.horizon if finalDay is None else finalDay
+        self.decisionDay = self.initialDay if decisionDay is None else decisionDay
+        self.rng = RandomStreams().get("evaluation") if rng is None else rng
+        self.engine = SimulationEngine(data.demand, data.getInitialStock(), self.initialDay, self.finalDay)
+        self.results = {}
+
+    # Demand paths (count x simulated days)
+    def samplePaths(self, count):
+        days = np.arange(self.initialDay, self.finalDay)
+        uncertainty = params.currentUncertainty * np.sqrt(np.maximum(0, days - self.decisionDay))
+        error = self.rng.uniform(-2, 2, (count, len(days))) * uncertainty
+        return np.maximum(0, self.data.demand[days] * (1 + (error/5)))
+
+    # policies: {name: repositions of every day}, returns {name: {statistic: summary}} (see summarize)
+    def evaluate(self, policies):
+        names = sorted(policies.keys())
+        values = dict((name, dict((s, []) for s in self.statistics)) for name in names)
+
+        for first in range(0, self.numPaths, self.chunkSize):
+            paths = self.samplePaths(min(self.chunkSize, self.numPaths - first))
+            for name in names:
+                obj, fault, stock = self.engine.runWindow(policies[name], demand=paths)
+                values[name]["profit"].append(obj[:, -1])
+                values[name]["faults"].append(fault.sum(axis=1))
+                values[name]["stockoutDays"].append((fault > 0).sum(axis=1))
+
+        self.results = {}
+        for name in names:
+            self.results[name] = {}
+            for statistic in self.statistics:
+                # the worst tail is the lowest profits and the highest faults
+                self.results[name][statistic] = self.summarize(np.concatenate(values[name][statistic]),
+                                                               lowerTail=(statistic == "profit"))
+        return self.results
+
+    # Mean, standard deviation, quantiles and CVaR (mean of the worst cvarLevel fraction of the paths)
+    @staticmethod
+    def summarize(values, lowerTail=False):
+        values = np.sort(np.asarray(values, dtype=float))
+        tail = max(1, int(np.ceil(params.cvarLevel * len(values))))
+        summary = {"mean": float(values.mean()), "std": float(values.std()),
+                   "cvar": float(values[:tail].mean() if lowerTail else values[-tail:].mean())}
+        for q in params.monteCarloQuantiles:
+            summary["q" + '{:g}'.format(100 * q)] = float(np.percentile(values, 100 * q))
+        return summary
+
+    def printResults(self):
+        print "Monte Carlo evaluation, " + str(self.numPaths) + " demand paths (CVaR " + \
+              '{:g}'.format(100 * params.cvarLevel) + "%)"
+        for name in sorted(self.results.keys()):
+            profit = self.results[name]["profit"]
+            faults = self.results[name]["faults"]
+            print "  %s: profit mean %.0f, CVaR %.0f; faults mean %.1f, CVaR %.1f" % \
+                  (name, profit["mean"], profit["cvar"], faults["mean"], faults["cvar"])
+
+    def save(self, filename):
+        f = open(filename, "w")
+        json.dump({"numPaths": self.numPaths, "decisionDay": self.decisionDay, "cvarLevel": params.cvarLevel,
+                   "policies": self.results}, f, indent=2, sort_keys=True)
+        f.close()
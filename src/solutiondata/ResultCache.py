@@ -0,0 +1,176 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+import sys
+import numpy as np
+from src.inputdata.Parameters import Parameters as params
+
+
+# Content addressed cache of experiment results, so re-running the experiment grid only solves the experiments
+# whose inputs changed. The key of an experiment is a hash of:
+#   - its ExperimentConfig (including the seed) and every Parameters value that can change the results
+#     (ignoredParameters are the output, performance and grid settings, the grid values are in the config),
+#   - the contents of the input data file,
+#   - the solver version: the lp backend with its library version,
+#   - the source of the code that computes the results (sourceFiles: the planner, forecasts, scenarios, solvers
+#     and simulation), so a code change never serves stale results.
+# An entry is a folder with the output files of the experiment (results.npz, evaluation.json) and the full
+# simulation arrays. Entries are evicted in least recently used order past Parameters.resultCacheSize (MB).
+# Entries can be listed or removed by hand, from the folder that contains src:
+#   python -m src.solutiondata.ResultCache list|invalidate [key ...]
+class ResultCache:
+    formatVersion = 1
+    sourceFiles = ("Main.py", "inputdata", "solvers", "solutiondata")  # files or packages, relative to src
+    outputFiles = ("results.npz", "evaluation.json")
+    ignoredParameters = ("currentUncertainty", "currentRobustness", "currentRepositionInterval", "currentLeadTime",
+                         "uncertainties", "robustness", "leadTimes", "repositionIntervals", "seed", "numWorkers",
+                         "dataFile", "dataCacheDir", "lpExportMode", "lpExportInterval", "lpExportDir",
+                         "plotMode", "renderWorkers", "animationMode", "instrumentation", "instrumentationFile",
+                         "exportCsv", "resultCache", "resultCacheDir", "resultCacheSize",
+                         "checkpointInterval", "resume")
+    dataHashes = {}  # (path, modification time, size) -> hash of the contents, the file is read once per process
+    srcDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def __init__(self, cacheDir=None, maxSize=None):
+        self.cacheDir = params.resultCacheDir if cacheDir is None else cacheDir
+        self.maxSize = params.resultCacheSize if maxSize is None else maxSize
+
+    def getKey(self, config):
+        fields = dict((name, value) for name, value in vars(params).items()
+                      if not name.startswith("_") and name not in self.ignoredParameters)
+        fields["config"] = list(config)
+        fields["data"] = self.getDataHash(params.dataFile)
+        fields["solver"] = self.getSolverVersion()
+        fields["source"] = self.getSourceHash(self.sourceFiles)
+        fields["format"] = self.formatVersion
+        return hashlib.sha1(json.dumps(fields, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def getDataHash(filename):
+        status = os.stat(filename)
+        fileKey = (os.path.abspath(filename), int(status.st_mtime), status.st_size)
+        if fileKey not in ResultCache.dataHashes:
+            md5 = hashlib.md5()
+            f = open(filename, "rb")
+            for block in iter(lambda: f.read(1 << 20), b""):
+                md5.update(block)
+            f.close()
+            ResultCache.dataHashes[fileKey] = md5.hexdigest()
+        return ResultCache.dataHashes[fileKey]
+
+    @staticmethod
+    def getSolverVersion():
+        version = params.lpBackend
+        try:
+            if params.lpBackend == "cplex":
+                import cplex
+                version += " " + cplex.__version__
+            else:
+                import scipy
+                version += " " + scipy.__version__
+        except ImportError:
+            pass
+        return version
+
+    # Hash of the python sources of the given files and packages (relative to src)
+    @staticmethod
+    def getSourceHash(sources):
+        md5 = hashlib.md5()
+        for source in sources:
+            path = os.path.join(ResultCache.srcDir, source)
+            for filename in sorted(glob.glob(os.path.join(path, "*.py"))) if os.path.isdir(path) else [path]:
+                md5.update(source.encode("utf-8") + b"/" + os.path.basename(filename).encode("utf-8") + b"\n")
+                f = open(filename, "rb")
+                md5.update(f.read())
+                f.close()
+        return md5.hexdigest()
+
+    def getEntry(self, key):
+        return os.path.join(self.cacheDir, key)
+
+    # Copies the cached output files of the experiment to path and returns its simulation arrays,
+    # None if the experiment is not cached
+    def load(self, key, path):
+        entry = self.getEntry(key)
+        if not os.path.exists(entry):
+            return None
+
+        # another process can evict the entry meanwhile, then it is a miss
+        try:
+            archive = np.load(os.path.join(entry, "simulation.npz"))
+            simulations = dict((name, archive[name]) for name in archive.files)
+            archive.close()
+            for name in self.outputFiles:
+                if os.path.exists(os.path.join(entry, name)):
+                    shutil.copyfile(os.path.join(entry, name), os.path.join(path, name))
+            os.utime(entry, None)  # most recently used
+        except (IOError, OSError):
+            return None
+        return simulations
+
+    # Keeps the output files (in path) and the simulation arrays of an experiment
+    def store(self, key, path, simulations):
+        if not os.path.exists(self.cacheDir):
+            os.makedirs(self.cacheDir)
+
+        # written to a temporary folder and renamed, so a concurrent run never loads a half written entry
+        tmpEntry = self.getEntry(key) + "." + str(os.getpid()) + ".tmp"
+        if os.path.exists(tmpEntry):
+            shutil.rmtree(tmpEntry)
+        os.makedirs(tmpEntry)
+        for name in self.outputFiles:
+            if os.path.exists(os.path.join(path, name)):
+                shutil.copyfile(os.path.join(path, name), os.path.join(tmpEntry, name))
+        np.savez_compressed(os.path.join(tmpEntry, "simulation.npz"), **simulations)
+
+        try:
+            os.rename(tmpEntry, self.getEntry(key))
+        except OSError:
+            shutil.rmtree(tmpEntry, True)  # another run stored the experiment first
+        self.evict()
+
+    # [(key, size in bytes, last use)] of the entries, least recently used first
+    def getEntries(self):
+        entries = []
+        if os.path.exists(self.cacheDir):
+            for key in os.listdir(self.cacheDir):
+                entry = self.getEntry(key)
+                if key.endswith(".tmp") or not os.path.isdir(entry):
+                    continue
+                size = sum(os.path.getsize(os.path.join(entry, name)) for name in os.listdir(entry))
+                entries.append((key, size, os.path.getmtime(entry)))
+        return sorted(entries, key=lambda e: e[2])
+
+    def evict(self):
+        entries = self.getEntries()
+        total = sum(e[1] for e in entries)
+        for key, size, used in entries:
+            if total <= self.maxSize * 1024 * 1024:
+                break
+            shutil.rmtree(self.getEntry(key), True)
+            total -= size
+
+    # Removes the given entries (all of them by default), returns the number of removed entries
+    def invalidate(self, keys=None):
+        entries = [e[0] for e in self.getEntries()]
+        if keys is not None:
+            entries = [key for key in entries if key in keys]
+        for key in entries:
+            shutil.rmtree(self.getEntry(key), True)
+        return len(entries)
+
+
+if __name__ == "__main__":
+    # the configured folder is relative to src, where the planner runs
+    cache = ResultCache(os.path.join(ResultCache.srcDir, params.resultCacheDir))
+    command = sys.argv[1] if len(sys.argv) > 1 else "list"
+    if command == "invalidate":
+        print "Removed " + str(cache.invalidate(sys.argv[2:] or None)) + " cached experiments"
+    else:
+        entries = cache.getEntries()
+        for key, size, used in entries:
+            print "%s %8.2f MB" % (key, size / (1024.0 * 1024.0))
+        print str(len(entries)) + " cached experiments, " + \
+              '{:.2f}'.format(sum(e[1] for e in entries) / (1024.0 * 1024.0)) + " MB"
@@ -0,0 +1,130 @@
+import numpy as np
+
+
+# Columnar store with every result of one experiment, written with a single (compressed) bulk write.
+# Planned values are kept as (planningDays, horizon) bands: row d, column k is the value planned on day
+# days[d] for day days[d] + k. Simulated KPIs are kept as (planningDays,) columns.
+# Arrays are named "<model>_<field>", e.g. "robust_plannedStocks" or "deterministic_obj".
+class ResultStore:
+
+    models = ("robust", "deterministic")
+    plannedFields = ("plannedStocks", "plannedRepositions", "plannedFaults")
+    simulationFields = ("obj", "stock", "reposition", "fault")
+
+    def __init__(self, arrays=None):
+        self.arrays = {} if arrays is None else arrays
+
+    # Collects the results of a finished experiment (config is (uncertainty, robustness, repositionInterval, leadTime))
+    @staticmethod
+    def create(data, config, firstDay, lastDay, horizon, solvers, simulations):
+        days = np.arange(firstDay, lastDay)
+        columns = days[:, np.newaxis] + np.arange(horizon)[np.newaxis, :]
+
+        forecast = data.forecast[firstDay:lastDay, :horizon].astype(float)
+        interval = config[0] * np.sqrt(np.arange(horizon))
+
+        arrays = {}
+        arrays["config"] = np.asarray(config, dtype=float)
+        arrays["days"] = days
+        arrays["demand"] = ResultStore.band(data.demand, columns)
+        arrays["forecast"] = forecast
+        arrays["error"] = forecast * (interval / 5)
+
+        for model, solver, simulation in zip(ResultStore.models, solvers, simulations):
+            for field in ResultStore.plannedFields:
+                planned = getattr(solver, field)
+                arrays[model + "_" + field] = np.array([ResultStore.band(planned[day], columns[d])
+                                                        for d, day in enumerate(days)]).reshape(columns.shape)
+            for field in ResultStore.simulationFields:
+                arrays[model + "_" + field] = ResultStore.band(getattr(simulation, field), days)
+
+        return ResultStore(arrays)
+
+    # values[columns], with 0 for the columns past the end of values
+    @staticmethod
+    def band(values, columns):
+        values = np.asarray(values, dtype=float)
+        valid = columns < len(values)
+        return np.where(valid, values[np.minimum(columns, len(values) - 1)], 0.0)
+
+    @staticmethod
+    def load(filename):
+        archive = np.load(filename)
+        try:
+            return ResultStore(dict((key, archive[key]) for key in archive.files))
+        finally:
+            archive.close()
+
+    def save(self, filename):
+        if not filename.endswith(".npz"):
+            filename += ".npz"
+        np.savez_compressed(filename, **self.arrays)
+        return filename
+
+    # Query API
+
+    def getConfig(self):
+        uncertainty, robustness, repositionInterval, leadTime = self.arrays["config"]
+        return float(uncertainty), float(robustness), int(repositionInterval), int(leadTime)
+
+    def getDays(self):
+        return self.arrays["days"]
+
+    def getRow(self, day):
+        return int(day - self.arrays["days"][0])
+
+    # Days covered by the plan made on the given day
+    def getHorizonDays(self, day):
+        return day + np.arange(self.arrays["forecast"].shape[1])
+
+    def getDemand(self, day):
+        return self.arrays["demand"][self.getRow(day)]
+
+    def getForecast(self, day):
+        return self.arrays["forecast"][self.getRow(day)]
+
+    def getError(self, day):
+        return self.arrays["error"][self.getRow(day)]
+
+    # Plan of the given model for the given day, or the whole (days, horizon) band if day is None
+    def getPlanned(self, model, field, day=None):
+        values = self.arrays[model + "_" + field]
+        return values if day is None else values[self.getRow(day)]
+
+    def getSimulation(self, model, field):
+        return self.arrays[model + "_" + field]
+
+    # Locale style (";" separated, "," decimal) CSV exports
+
+    def exportDailyCsv(self, path):
+        header = "Day; Uncertainty; Robustness; Reposition Interval; Lead Time; Real Demand; Forecast; Error; Robust Stock;" \
+                 "Robust Reposition; Robust Lack; Deterministic Stock; Deterministic Reposition; Deterministic Lack\n"
+        columns = ["demand", "forecast", "error"]
+        for model in self.models:
+            columns += [model + "_" + field for field in self.plannedFields]
+
+        for day in self.getDays():
+            row = self.getRow(day)
+            values = [self.arrays[c][row] for c in columns]
+            self.writeCsv(path + "Result_Day" + str(day) + ".csv", header, self.getHorizonDays(day), values)
+
+    def exportSimulationCsv(self, filename):
+        header = "Day; Uncertainty; Robustness; Reposition Interval; Lead Time; Real Demand;" \
+                 "Robust Objective; Robust Stock; Robust Reposition; Robust Fault; " \
+                 "Deterministic Objective; Deterministic Stock; Deterministic Reposition; Deterministic Fault \n"
+        values = [self.arrays["demand"][:, 0]]
+        for model in self.models:
+            values += [self.arrays[model + "_" + field] for field in self.simulationFields]
+        self.writeCsv(filename, header, self.getDays(), values)
+
+    def writeCsv(self, filename, header, days, values):
+        config = "".join('{:g};'.format(c) for c in self.getConfig()).replace(".", ",")
+        table = np.column_stack(values)
+
+        lines = [header]
+        for t, row in zip(days, table):
+            lines.append(str(t) + ";" + config + "".join('{:.2f};'.format(v) for v in row).replace(".", ",") + "\n")
+
+        f = open(filename, "w")
+        f.write("".join(lines))
+        f.close()
@@ -0,0 +1,66 @@
+import numpy as np
+from src.inputdata.Parameters import Parameters as params
+
+
+# Replays reposition plans against a demand path, for many policies at once.
+# Each policy (row of the repositions matrix) starts the first day with the same initial stock, the reposition
+# decided on day t arrives on day t+L-1 (L = lead time, as in the stock flow of the solvers) and the demand that
+# the stock cannot attend is a fault:
+#   stock_{t+1} = max(0, stock_t + r_{t-L+1} - d_t), fault_t = max(0, d_t - stock_t - r_{t-L+1})
+# The recursion is solved in closed form from cumulative sums: the demand lost up to each day is the running
+# minimum of the unclipped stock, so there is no python loop over the days or the policies.
+class SimulationEngine:
+    def __init__(self, demand, initialStock, initialDay=None, finalDay=None):
+        self.demand = np.asarray(demand, dtype=float)  # realized demand of every day
+        self.initialStock = float(initialStock)
+        self.initialDay = params.initialDay if initialDay is None else initialDay
+        self.finalDay = self.initialDay + params.horizon if finalDay is None else finalDay
+
+    # repositions: (policies x days) matrix, or a single plan, over all the days of the demand.
+    # leadTimes: one lead time for every policy or one per policy (default: the current lead time).
+    # demand: replaces the realized demand, any shape that broadcasts to (policies x days), e.g. (paths x days)
+    # demand paths for a single policy.
+    # Returns the obj (cumulative profit), fault and stock matrices, 0 outside the simulated days.
+    def run(self, repositions, leadTimes=None, demand=None):
+        demand = self.demand if demand is None else np.asarray(demand, dtype=float)
+        obj, fault, stock = self.runWindow(repositions, leadTimes, np.atleast_2d(demand)[:, self.initialDay:self.finalDay])
+
+        numDays = np.atleast_2d(repositions).shape[1]
+        result = []
+        for window in (obj, fault, stock):
+            matrix = np.zeros((window.shape[0], numDays))
+            matrix[:, self.initialDay:self.finalDay] = window
+            result.append(matrix)
+        return tuple(result)
+
+    # Same as run, with the demand and the returned matrices only over the simulated days (initialDay to
+    # finalDay), so many demand paths can be simulated without copying the whole history
+    def runWindow(self, repositions, leadTimes=None, demand=None):
+        r = np.atleast_2d(np.asarray(repositions, dtype=float))
+        if leadTimes is None:
+            leadTimes = params.currentLeadTime
+        leadTimes = np.asarray(leadTimes, dtype=int).reshape(-1)
+        days = np.arange(self.initialDay, self.finalDay)
+
+        # arrivals: reposition decided L-1 days before each day (none before the first day of the data, nor after
+        # the last one with lead time 0)
+        lagDays = days[np.newaxis, :] - leadTimes[:, np.newaxis] + 1
+        lagIndex = np.clip(lagDays, 0, r.shape[1] - 1)
+        if len(leadTimes) == 1:
+            arrivals = r[:, lagIndex[0]]
+        else:
+            arrivals = r[np.arange(r.shape[0])[:, np.newaxis], lagIndex]
+        arrivals = np.where(np.logical_and(lagDays >= 0, lagDays < r.shape[1]), arrivals, 0.0)
+        d = np.atleast_2d(self.demand[days] if demand is None else np.asarray(demand, dtype=float))
+
+        # unclipped stock after each day, the demand lost so far and the (clipped) stock of the next day
+        unclipped = self.initialStock + np.cumsum(arrivals - d, axis=1)
+        lost = np.maximum(0.0, -np.minimum.accumulate(unclipped, axis=1))
+        nextStock = unclipped + lost
+
+        stock = np.concatenate((np.full((nextStock.shape[0], 1), self.initialStock), nextStock[:, :-1]), axis=1)
+        fault = np.concatenate((lost[:, :1], np.diff(lost, axis=1)), axis=1)
+
+        value = (params.unitPrice * d) - (params.productAbscenceCost * fault) - \
+                (params.unitCost * r[:, days]) - (params.unitStockageCost * stock)
+        return np.cumsum(value, axis=1), fault, stock
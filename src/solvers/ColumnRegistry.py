@@ -0,0 +1,75 @@
+import numpy as np
+from Variable import Variable
+
+
+# Column indexes of the variables of a model, computed arithmetically instead of looked up by name.
+# Each variable family (d, r, f, s, zsp, zsn, zp, zn) is a block of columns with a base offset:
+#   col = base + (scenario * scenarioStride) + ((t - firstDay) * dayStride)
+# Families that only exist on some days (r) keep a table with the column of each day (-1 = no variable).
+# Names and Variable objects are only made on demand, for debugging or to name the columns of an exported lp.
+class ColumnRegistry:
+    def __init__(self, firstDay=0, scenarioIds=None):
+        self.firstDay = firstDay
+        self.scenarioIds = scenarioIds  # scenario id of each scenario index, used in the names
+        # name -> (columns (scenarios x days), variable type, name format, indexed by day, indexed by scenario)
+        self.families = {}
+        self.variables = 0  # name -> Variable, made on the first getVariable call
+
+    # Block of numScenarios x numDays columns starting at base (None: the family is not indexed by scenario/day).
+    # nameFormat gives the variable names, with {t} for the day and {s} for the scenario id.
+    def addFamily(self, name, vtype, base, numDays=None, numScenarios=None, dayStride=1, scenarioStride=None,
+                  nameFormat=None):
+        days = 1 if numDays is None else numDays
+        scenarios = 1 if numScenarios is None else numScenarios
+        if scenarioStride is None:
+            scenarioStride = days * dayStride
+        columns = base + (np.arange(scenarios)[:, np.newaxis] * scenarioStride) + (np.arange(days) * dayStride)
+        self.families[name] = (columns, vtype, nameFormat or name, numDays is not None, numScenarios is not None)
+
+    # Family with an explicit column for each day (-1 when there is no variable that day)
+    def addTable(self, name, vtype, columns, nameFormat=None):
+        self.families[name] = (np.asarray(columns, dtype=int).reshape(1, -1), vtype, nameFormat or name, True, False)
+
+    # Column of the variable of the family for day t (None for families without days) and scenario index,
+    # -1 if there is no such variable
+    def getColumn(self, name, t=None, scenario=0):
+        columns = self.families[name][0]
+        k = 0 if t is None else t - self.firstDay
+        if k < 0 or k >= columns.shape[1] or scenario >= columns.shape[0]:
+            return -1
+        return int(columns[scenario, k])
+
+    # (scenarios x days) columns of the family
+    def getColumns(self, name):
+        return self.families[name][0]
+
+    def getVariable(self, name):
+        if self.variables == 0:
+            self.variables = dict((v.name, v) for v in self.createVariables())
+        if name in self.variables:
+            return self.variables[name]
+        return 0
+
+    # Name of every column of a model with numCols columns ("" for the columns of no family)
+    def getNames(self, numCols):
+        names = [""] * numCols
+        for v in self.createVariables():
+            names[v.col] = v.name
+        return names
+
+    def createVariables(self):
+        variables = []
+        for columns, vtype, nameFormat, hasDays, hasScenarios in self.families.values():
+            for s in range(columns.shape[0]):
+                sid = self.scenarioIds[s] if self.scenarioIds is not None else s
+                for k in range(columns.shape[1]):
+                    if columns[s, k] < 0:
+                        continue
+                    v = Variable()
+                    v.type = vtype
+                    v.col = int(columns[s, k])
+                    v.instant = self.firstDay + k if hasDays else 0
+                    v.scenario = sid if hasScenarios else 0
+                    v.name = nameFormat.format(t=v.instant, s=sid)
+                    variables.append(v)
+        return variables
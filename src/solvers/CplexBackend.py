@@ -0,0 +1,53 @@
+import cplex
+from LpBackend import LpBackend
+
+
+class CplexBackend(LpBackend):
+    name = "cplex"
+
+    def __init__(self, lp=None):
+        LpBackend.__init__(self)
+        self.lp = cplex.Cplex() if lp is None else lp
+        self.lp.set_log_stream(None)
+        self.lp.set_error_stream(None)
+        self.lp.set_warning_stream(None)
+        self.lp.set_results_stream(None)
+
+    # Pushes the whole model with one call for the columns, one for the rows and one for the coefficients
+    def load(self, model):
+        colNames = model.colNames if len(model.colNames) == model.numCols else None
+        rowNames = model.rowNames if len(model.rowNames) == model.numRows else None
+
+        if model.maximize:
+            self.lp.objective.set_sense(self.lp.objective.sense.maximize)
+        else:
+            self.lp.objective.set_sense(self.lp.objective.sense.minimize)
+
+        self.lp.variables.add(obj=model.getObjective().tolist(), lb=model.getLowerBounds().tolist(),
+                              ub=model.getUpperBounds().tolist(), names=colNames)
+        self.lp.linear_constraints.add(senses=model.getSenses(), rhs=model.getRhs().tolist(), names=rowNames)
+
+        rows, cols, vals = model.getCoefficients()
+        if len(vals) > 0:
+            self.lp.linear_constraints.set_coefficients(list(zip(rows.tolist(), cols.tolist(), vals.tolist())))
+
+    def solve(self):
+        self.lp.solve()
+
+    def getValues(self):
+        return self.lp.solution.get_values()
+
+    def getObjectiveValue(self):
+        return self.lp.solution.get_objective_value()
+
+    def getStatistics(self):
+        return {"rows": self.lp.linear_constraints.get_num(), "columns": self.lp.variables.get_num(),
+                "nonzeros": self.lp.linear_constraints.get_num_nonzeros(),
+                "iterations": self.lp.solution.progress.get_num_iterations()}
+
+    # cplex compresses the file when its name ends with .gz
+    def write(self, filename, compressed=False):
+        self.lp.write(filename + ".gz" if compressed else filename)
+
+    def snapshot(self):
+        return CplexBackend(cplex.Cplex(self.lp))
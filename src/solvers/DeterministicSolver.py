@@ -1,6 +1,11 @@
-import cplex
 import numpy as np
 from Variable import Variable
+from ModelMatrix import ModelMatrix
+from ColumnRegistry import ColumnRegistry
+from LpBackend import LpBackend
+from LpSolveError import LpSolveError
+from LpExporter import LpExporter
+from Instrumentation import Instrumentation
 from src.inputdata.Parameters import Parameters as params
 from src.inputdata.ProblemData import ProblemData as pdata
 from src.solutiondata.ProblemSolution import ProblemSolution
@@ -11,26 +16,244 @@ from src.solutiondata.ProblemSolution import ProblemSolution
 # ToDo: parametrize time period discretization
 
 class DeterministicSolver:
+    # planning state carried from one day to the next
+    stateFields = ("repositions", "initialStock", "plannedRepositions", "plannedStocks", "plannedFaults",
+                   "failedDays")
+
     def __init__(self, pData):
         self.pData = pData
         self.currentDay = params.initialDay
         self.finalDay = self.currentDay + params.horizon
-        self.repositions = [0 for i in range(0, len(pData.demandDataList))]  # the amounts repositioned to stock for each day
-        self.initialStock = [0 for i in range(0, len(pData.demandDataList))]  # the initial stock at each iteration
-        self.plannedRepositions = [[0 for i in range(len(pData.demandDataList))] for t in range(params.horizon)]
-        self.plannedStocks = [[0 for i in range(len(pData.demandDataList))] for t in range(params.horizon)]
-        self.plannedFaults = [[0 for i in range(len(pData.demandDataList))] for t in range(params.horizon)]
+        self.repositions = [0 for i in range(0, pData.numDays)]  # the amounts repositioned to stock for each day
+        self.initialStock = [0 for i in range(0, pData.numDays)]  # the initial stock at each iteration
+        self.plannedRepositions = [[0 for i in range(pData.numDays)] for t in range(params.horizon)]
+        self.plannedStocks = [[0 for i in range(pData.numDays)] for t in range(params.horizon)]
+        self.plannedFaults = [[0 for i in range(pData.numDays)] for t in range(params.horizon)]
+        self.failedDays = []  # days whose lp could not be solved, they kept the plan of the previous day
         self.lp = 0
-        self.variables = {}
+        self.backend = 0
+        self.variables = {}  # only used by the per variable model creation, see ColumnRegistry
+        self.columns = 0
         self.numCols = 0
         self.problemSolution = 0
 
 
     # Creates the linear program
     def createModel(self):
-        self.lp.objective.set_sense(self.lp.objective.sense.maximize)
-        self.createVariables()
-        self.createConstraints()
+        # the per variable/row creation talks to cplex directly, the other backends only take a ModelMatrix
+        # (bulkModelBuild = False is ignored by them)
+        if self.lp == 0 or params.bulkModelBuild or params.incrementalModel:
+            self.createBulkModel()
+        else:
+            self.lp.objective.set_sense(self.lp.objective.sense.maximize)
+            self.createVariables()
+            self.createConstraints()
+
+            # same column layout as the bulk model
+            horizon = self.finalDay - self.currentDay
+            repositionDays = self.getRepositionDays()
+            self.dBase = 0
+            self.setRepositionColumns(horizon, repositionDays)
+            self.fBase = horizon + len(repositionDays)
+            self.sBase = self.fBase + horizon
+            self.registerColumns(repositionDays)
+
+    #region Bulk Model Creation
+    # Builds the same model as createVariables/createConstraints from arrays, in a few bulk calls.
+    # Column layout: d | r | f | s, row layout: initial stock | stock flow (t)
+    def createBulkModel(self):
+        horizon = self.finalDay - self.currentDay
+        days = np.arange(self.currentDay, self.finalDay)
+        repositionDays = self.getRepositionDays()
+
+        # in incremental mode there is a reposition column for each t of the horizon, see RobustSolver
+        # Names are only given when the lp can be exported (they would not follow the days in incremental mode).
+        named = params.lpExportMode != "off" and not params.incrementalModel
+        rDays = list(days) if params.incrementalModel else repositionDays
+        m = ModelMatrix(maximize=True)
+
+        self.computeInitialStock()
+
+        # columns
+        demand = self.getDemandForecast()
+        self.dBase = m.addColumns(horizon, obj=params.unitPrice, lb=demand, ub=demand)
+        rBase = m.addColumns(len(rDays), obj=-params.unitCost, ub=self.getRepositionUpperBounds(rDays))
+        self.fBase = m.addColumns(horizon, obj=-params.productAbscenceCost, ub=1000000)
+        self.sBase = m.addColumns(horizon, obj=-params.unitStockageCost, ub=1000000)
+        self.setRepositionColumns(rBase, rDays)
+        self.registerColumns(repositionDays)
+        if named:
+            m.colNames = self.columns.getNames(m.numCols)
+
+        # initial stock
+        base = m.addRows(1, "E", self.initialStock[self.currentDay], names=["initial_stock"] if named else None)
+        m.addCoefficients(base, self.sBase, 1.0)
+
+        # stock flow: s_{t} + r_{t-L+1} + f_{t} - d_{t} - s_{t+1} = 0
+        numFlows = horizon - 1
+        flow = np.arange(numFlows)
+        base = m.addRows(numFlows, "E", self.getFlowRhs(),
+                         names=["stock_flow" + str(t) for t in days[:numFlows]] if named else None)
+        m.addCoefficients(base + flow, self.sBase + flow, 1.0)
+        m.addCoefficients(base + flow, self.fBase + flow, 1.0)
+        m.addCoefficients(base + flow, self.dBase + flow, -1.0)
+        m.addCoefficients(base + flow, self.sBase + flow + 1, -1.0)
+
+        lagCol = self.getLagColumns()
+        hasR = lagCol >= 0
+        m.addCoefficients(base + flow[hasR], lagCol[hasR], 1.0)
+
+        self.backend.load(m)
+        self.numCols = m.numCols
+
+    # Shifts a model created in incremental mode to the current day (demand bounds, right hand sides
+    # and reposition bounds), the objective and the matrix are left untouched
+    def updateBulkModel(self):
+        horizon = self.finalDay - self.currentDay
+        repositionDays = self.getRepositionDays()
+        self.computeInitialStock()
+
+        demand = self.getDemandForecast().tolist()
+        dCols = range(self.dBase, self.dBase + horizon)
+        self.lp.variables.set_lower_bounds(list(zip(dCols, demand)))
+        self.lp.variables.set_upper_bounds(list(zip(dCols, demand)))
+
+        rhs = [float(self.initialStock[self.currentDay])] + self.getFlowRhs().tolist()
+        self.lp.linear_constraints.set_rhs(list(enumerate(rhs)))
+
+        days = range(self.currentDay, self.finalDay)
+        self.lp.variables.set_upper_bounds(list(zip(self.rCol.tolist(), self.getRepositionUpperBounds(days).tolist())))
+
+        self.registerColumns(repositionDays)
+
+    def getDemandForecast(self):
+        return np.array([self.pData.getForecast(self.currentDay, t) for t in range(self.currentDay, self.finalDay)],
+                        dtype=float)
+
+    def getRepositionDays(self):
+        return [rDay for rDay in self.pData.repositionDays if rDay >= self.currentDay and rDay < self.finalDay]
+
+    def getRepositionUpperBounds(self, days):
+        isRepositionDay = np.isin(np.array(days, dtype=int), self.pData.repositionDays)
+        return np.where(isRepositionDay, ModelMatrix.infinity, 0.0)
+
+    # Reposition column that arrives on each stock flow row (t-L+1), -1 when it is not part of the model
+    def getLagColumns(self):
+        horizon = self.finalDay - self.currentDay
+        lagDays = np.arange(self.currentDay, self.finalDay - 1) - params.currentLeadTime + 1
+        inHorizon = lagDays >= self.currentDay
+        return np.where(inHorizon, self.rCol[np.clip(lagDays - self.currentDay, 0, horizon - 1)], -1)
+
+    # Right hand side of the stock flow rows, repositions decided on previous iterations
+    def getFlowRhs(self):
+        lagDays = np.arange(self.currentDay, self.finalDay - 1) - params.currentLeadTime + 1
+        rhs = np.zeros(len(lagDays))
+        fromPast = np.logical_and(self.getLagColumns() < 0, lagDays >= 0)
+        rhs[fromPast] -= np.array(self.repositions, dtype=float)[lagDays[fromPast]]
+        return rhs
+
+    # Column index of the reposition variable for each t of the horizon (-1 when there is none), the reposition
+    # columns start at rBase, one for each of rDays
+    def setRepositionColumns(self, rBase, rDays):
+        self.rCol = np.full(self.finalDay - self.currentDay, -1, dtype=int)
+        self.rCol[np.array(rDays, dtype=int) - self.currentDay] = rBase + np.arange(len(rDays))
+
+    # Column registry of the model (layout d | r | f | s), only the reposition days have an r variable
+    def registerColumns(self, repositionDays):
+        horizon = self.finalDay - self.currentDay
+        rTable = np.full(horizon, -1, dtype=int)
+        k = np.array(repositionDays, dtype=int) - self.currentDay
+        rTable[k] = self.rCol[k]
+
+        self.columns = ColumnRegistry(self.currentDay)
+        self.columns.addFamily("d", Variable.v_demand, self.dBase, horizon, nameFormat="d{t}")
+        self.columns.addTable("r", Variable.v_reposition, rTable, nameFormat="r{t}")
+        self.columns.addFamily("f", Variable.v_fault, self.fBase, horizon, nameFormat="f{t}")
+        self.columns.addFamily("s", Variable.v_stock, self.sBase, horizon, nameFormat="s{t}")
+    #endregion
+
+    #region Fast Path
+    # The deterministic model is an uncapacitated lot sizing problem with lost sales and linear costs, so it is
+    # solved without an lp in O(horizon): the stock on hand is used first and each unit still missing on day t
+    # is bought on the latest reposition day that arrives by t, if buying and holding it until t is cheaper
+    # than failing the demand (f). Returns the r, f and s arrays for the horizon and the objective value.
+    def computeFastSolution(self):
+        horizon = self.finalDay - self.currentDay
+        isRepositionDay = np.isin(np.arange(self.currentDay, self.finalDay), self.pData.repositionDays)
+        demand = self.getDemandForecast()
+        self.computeInitialStock()
+
+        r = np.zeros(horizon)
+        f = np.zeros(horizon)
+        s = np.zeros(horizon)
+        arrivals = np.zeros(horizon)  # fixed arrivals, from repositions decided on previous iterations
+        lag = np.full(horizon, -1, dtype=int)  # reposition (relative day) arriving on each stock flow row
+
+        stock = self.initialStock[self.currentDay]
+        latest = -1
+        for k in range(horizon - 1):
+            # stock flow of day t: s_{t} + r_{t-L+1} + f_{t} - s_{t+1} = d_{t}
+            lagDay = self.currentDay + k - params.currentLeadTime + 1
+            if lagDay >= self.currentDay and isRepositionDay[lagDay - self.currentDay]:
+                latest = lagDay - self.currentDay
+                lag[k] = latest
+            elif lagDay >= 0:
+                arrivals[k] = self.repositions[lagDay]
+                stock += arrivals[k]
+
+            need = demand[k] - stock
+            stock = max(0, stock - demand[k])
+            if need <= 0:
+                continue
+
+            # a unit bought on the latest reposition day arrives on row latest+L-1 and is held until t
+            holdingDays = k - (latest + params.currentLeadTime - 1)
+            if latest >= 0 and params.unitCost + (params.unitStockageCost * holdingDays) < params.productAbscenceCost:
+                r[latest] += need
+            else:
+                f[k] = need
+
+        # stock levels, including the units bought in advance
+        s[0] = self.initialStock[self.currentDay]
+        for k in range(horizon - 1):
+            arrival = r[lag[k]] if lag[k] >= 0 else arrivals[k]
+            s[k+1] = max(0, s[k] + arrival + f[k] - demand[k])
+
+        obj = (params.unitPrice * demand.sum()) - (params.unitCost * r.sum()) - \
+              (params.productAbscenceCost * f.sum()) - (params.unitStockageCost * s.sum())
+        return r, f, s, obj
+
+    # Plan of a day whose lp could not be solved: the repositions the previous day planned for the days of this
+    # one (none on the first day), the planned stocks and faults are left empty
+    def keepPreviousPlan(self):
+        day = self.currentDay
+        self.failedDays.append(day)
+        if day > params.initialDay:
+            for t in self.getRepositionDays():
+                self.plannedRepositions[day][t] = self.plannedRepositions[day - 1][t]
+            self.repositions[day] = self.plannedRepositions[day - 1][day]
+
+    # Saves a plan given as arrays over the horizon (r is only read on the reposition days)
+    def savePlan(self, r, f, s):
+        day = self.currentDay
+        self.plannedStocks[day][day:self.finalDay] = np.asarray(s, dtype=float).tolist()
+        self.plannedFaults[day][day:self.finalDay] = np.asarray(f, dtype=float).tolist()
+
+        for t in self.getRepositionDays():
+            if t == day:
+                self.repositions[day] = float(r[t - day])
+            self.plannedRepositions[day][t] = float(r[t - day])
+
+    # Cross check mode: compares the lp solution with the fast path
+    def checkFastSolution(self, x):
+        r, f, s, obj = self.computeFastSolution()
+        lpObj = self.backend.getObjectiveValue()
+        lpReposition = self.repositions[self.currentDay]
+        tolerance = 1e-6 * max(1.0, abs(lpObj))
+        if abs(obj - lpObj) > tolerance or abs(r[0] - lpReposition) > tolerance:
+            print "Fast path mismatch on t" + str(self.currentDay) + ": objective " + str(obj) + " / " + \
+                  str(lpObj) + ", reposition " + str(r[0]) + " / " + str(lpReposition)
+    #endregion
 
     #region Variable Creation
     def createVariables(self):
@@ -89,6 +312,8 @@ class DeterministicSolver:
     def getVariable(self, vname):
         if vname in self.variables:
             return self.variables[vname]
+        if self.columns != 0:
+            return self.columns.getVariable(vname)
         return 0
     #endregion
 
@@ -103,7 +328,7 @@ class DeterministicSolver:
         if t == params.initialDay:
             self.initialStock[t] = self.pData.getInitialStock()
         else:
-            self.initialStock[t] = self.initialStock[t-1] - self.pData.demandDataList[t-1].demand
+            self.initialStock[t] = self.initialStock[t-1] - self.pData.demand[t-1]
             if t-params.currentLeadTime > 0:
                 self.initialStock[t] += self.repositions[t-params.currentLeadTime]
 
@@ -156,68 +381,98 @@ class DeterministicSolver:
         return numCons
 
     def createConstraint(self, mind, mval, sense, rhs, name):
-        mConstraint = cplex.SparsePair(ind=mind, val=mval)
-        self.lp.linear_constraints.add(lin_expr=[mConstraint],
+        self.lp.linear_constraints.add(lin_expr=[[mind, mval]],
                                     senses=[sense], rhs=[rhs],
                                     names=[name])
     #endregion
 
+    # Planning state saved by the checkpoints (the lp is rebuilt after a resume)
+    def getState(self):
+        return dict((name, getattr(self, name)) for name in self.stateFields)
+
+    def setState(self, state):
+        for name in self.stateFields:
+            setattr(self, name, state[name])
+
     def reset(self):
         self.lp = 0
+        self.backend = 0
         self.variables = {}
+        self.columns = 0
         self.numCols = 0
 
     def createLp(self):
+        # in incremental mode the model of the previous day is shifted in place and the dual simplex starts from
+        # the previous optimal basis. The basis is not shifted with the days and a reposition bound that changes
+        # between 0 and infinity breaks its dual feasibility, so it is only a heuristic starting point
+        # Backends without a native model (see LpBackend) are rebuilt every day.
+        if params.incrementalModel and self.lp != 0:
+            self.updateBulkModel()
+            return
+
         self.reset()
-        self.lp = cplex.Cplex()
-        self.lp.set_log_stream(None)
-        self.lp.set_error_stream(None)
-        self.lp.set_warning_stream(None)
-        self.lp.set_results_stream(None)
+        self.backend = LpBackend.create()
+        self.lp = self.backend.lp
+        if self.lp != 0 and params.incrementalModel:
+            self.lp.parameters.lpmethod.set(self.lp.parameters.lpmethod.values.dual)
+            self.lp.parameters.advance.set(1)
         self.createModel()
 
+    def saveSolution(self, x):
+        # the columns of each family are read as one slice of the solution
+        x = np.asarray(x, dtype=float)
+        rCol = self.columns.getColumns("r")[0]
+        r = np.where(rCol >= 0, x[np.maximum(rCol, 0)], 0.0)
+        self.savePlan(r, x[self.columns.getColumns("f")[0]], x[self.columns.getColumns("s")[0]])
+
     def solve(self, day=0):
         self.currentDay = day
         self.finalDay = self.currentDay + params.horizon
+        Instrumentation.begin("deterministic", day)
+
+        # solve the model without an lp
+        if params.deterministicMode == "fast":
+            r, f, s, obj = self.computeFastSolution()
+            Instrumentation.mark("deterministic", "fastSolution")
+            self.savePlan(r, f, s)
+            Instrumentation.mark("deterministic", "extraction")
+            Instrumentation.end("deterministic")
+            return self.problemSolution
 
         try:
             # create lp
             self.createLp()
+            Instrumentation.mark("deterministic", "createLp")
 
-            # write the lp
-            self.lp.write(".\\..\\lps\\deterministico_dia" + str(day) + ".lp")
+            # export the lp (if enabled)
+            LpExporter.export(self.backend, "deterministico", day)
+            Instrumentation.mark("deterministic", "export")
 
             # solve the model
-            self.lp.solve()
+            self.backend.solve()
+            Instrumentation.mark("deterministic", "solve")
 
             # process solution, get stock reposition for current day
-            solution = self.lp.solution
-            x = solution.get_values()
+            x = self.backend.getValues()
 
-            # save the obtained reposition for the current day, if any
             # save the solution data
-            for t in range(self.currentDay, self.finalDay):
-                # Stock
-                s = self.getVariable("s" + str(t))
-                if s != 0:
-                    val = x[s.col]
-                    self.plannedStocks[self.currentDay][t] = val
-
-                # Falta
-                fvar = self.getVariable("f" + str(t))
-                if fvar != 0:
-                    val = x[fvar.col]
-                    self.plannedFaults[self.currentDay][t] = val
-
-                # Repositioning
-                r = self.getVariable("r" + str(t))
-                if r != 0:
-                    if t == self.currentDay:
-                        self.repositions[self.currentDay] = x[r.col]
-                    self.plannedRepositions[self.currentDay][t] = x[r.col]
-
+            self.saveSolution(x)
+            Instrumentation.mark("deterministic", "extraction")
+
+            if params.deterministicMode == "check":
+                self.checkFastSolution(x)
+                Instrumentation.mark("deterministic", "check")
+
+        except LpSolveError as e:
+            print "Error on t" + str(self.currentDay) + ": " + str(e) + ", keeping the plan of the previous day"
+            LpExporter.export(self.backend, "deterministico", day, failed=True)
+            self.keepPreviousPlan()
+            Instrumentation.end("deterministic", failed=True)
+            return self.problemSolution
         except:
             print "Error on t" + str(self.currentDay)
+            LpExporter.export(self.backend, "deterministico", day, failed=True)
             raise
 
+        Instrumentation.end("deterministic", self.backend)
         return self.problemSolution
@@ -0,0 +1,124 @@
+import numpy as np
+import scipy
+from scipy.optimize import linprog
+from scipy.sparse import csr_matrix, diags
+from LpBackend import LpBackend
+from ModelMatrix import ModelMatrix
+from LpSolveError import LpSolveError
+
+
+# Open source backend, solves the ModelMatrix with scipy.optimize.linprog: HiGHS on scipy >= 1.6 (python 3).
+# The scipy releases of python 2 (< 1.6) have no HiGHS, the sparse interior point method is used instead
+# (slower and its solutions are not vertices, but it needs no license).
+class HighsBackend(LpBackend):
+    name = "highs"
+    hasHighs = tuple(int(v) for v in scipy.__version__.split(".")[:2]) >= (1, 6)
+    # interior point attempts (scale the rows, presolve), each one tried when the previous one fails: the
+    # objective is always scaled to 1, then every row is also scaled to a largest coefficient of 1 (the profit rows
+    # of the robust model have prices in the thousands and a rhs around 1e7), then without presolve
+    interiorPointAttempts = ((False, True), (True, True), (True, False))
+
+    def __init__(self):
+        LpBackend.__init__(self)
+        self.model = 0
+        self.result = 0
+
+    def load(self, model):
+        self.model = model
+        self.result = 0
+
+    def solve(self):
+        m = self.model
+        rows, cols, vals = m.getCoefficients()
+        matrix = csr_matrix((vals, (rows, cols)), shape=(m.numRows, m.numCols))
+        senses = np.array(list(m.getSenses()))
+        rhs = m.getRhs()
+
+        # linprog takes A_ub x <= b_ub and A_eq x = b_eq, "G" rows are flipped
+        eq = senses == "E"
+        ub = ~eq
+        sign = np.where(senses == "G", -1.0, 1.0)[ub]
+        aUb = csr_matrix(matrix[ub].multiply(sign[:, np.newaxis])) if ub.any() else None
+        bUb = rhs[ub] * sign if ub.any() else None
+        aEq = matrix[eq] if eq.any() else None
+        bEq = rhs[eq] if eq.any() else None
+
+        lb = m.getLowerBounds()
+        upper = m.getUpperBounds()
+        lb = np.where(lb <= -ModelMatrix.infinity, -np.inf, lb)
+        upper = np.where(upper >= ModelMatrix.infinity, np.inf, upper)
+
+        # linprog minimizes
+        c = -m.getObjective() if m.maximize else m.getObjective()
+        if self.hasHighs:
+            self.result = linprog(c, A_ub=aUb, b_ub=bUb, A_eq=aEq, b_eq=bEq, bounds=np.column_stack((lb, upper)),
+                                  method="highs")
+        else:
+            self.solveInteriorPoint(c, (aUb, bUb, aEq, bEq), lb, upper, (matrix, senses, rhs))
+        if self.result.status != 0:
+            raise LpSolveError("linprog (" + ("HiGHS" if self.hasHighs else "interior point") + ") failed: " +
+                               str(self.result.message))
+
+    # rows: (aUb, bUb, aEq, bEq) of linprog, original: (matrix, senses, rhs) of the model, to check the solution.
+    # The objective (prices in the thousands) is scaled to 1, the interior point method converges poorly on large
+    # costs
+    def solveInteriorPoint(self, c, rows, lb, upper, original):
+        bounds = [(l, None if u == np.inf else u) for l, u in zip(lb.tolist(), upper.tolist())]
+        scale = max(1.0, np.abs(c).max())
+        for scaleRows, presolve in self.interiorPointAttempts:
+            aUb, bUb, aEq, bEq = rows
+            if scaleRows:
+                aUb, bUb = self.scaleRows(aUb, bUb)
+                aEq, bEq = self.scaleRows(aEq, bEq)
+            self.result = linprog(c / scale, A_ub=aUb, b_ub=bUb, A_eq=aEq, b_eq=bEq, bounds=bounds,
+                                  method="interior-point", options={"sparse": True, "presolve": presolve})
+            self.result.fun *= scale
+
+            # the large profit rows (prices x demand) often end with "numerical difficulties" (status 4) on a
+            # solution that is feasible up to a relative 1e-5 of the model rows, which is accepted
+            if self.result.status == 4 and self.getViolation(original[0], original[1], original[2], lb, upper) <= 1e-5:
+                self.result.status = 0
+            if self.result.status == 0:
+                return
+
+    # Rows divided by their largest coefficient
+    @staticmethod
+    def scaleRows(a, b):
+        if a is None:
+            return a, b
+        largest = abs(a).max(axis=1).toarray().ravel()
+        largest[largest == 0] = 1.0
+        return csr_matrix(diags(1.0 / largest).dot(a)), b / largest
+
+    # Largest constraint or bound violation of the solution, relative to the right hand side (at least 1)
+    def getViolation(self, matrix, senses, rhs, lb, upper):
+        x = self.result.x
+        activity = matrix.dot(x)
+        violation = np.where(senses == "E", np.abs(activity - rhs),
+                             np.where(senses == "G", rhs - activity, activity - rhs))
+        bounds = np.maximum(lb - x, x - upper)
+        return max(0.0, (violation / np.maximum(1.0, np.abs(rhs))).max(), bounds.max())
+
+    # The ModelMatrix is not changed after it is loaded, so it can be shared with the writer thread
+    def snapshot(self):
+        backend = HighsBackend()
+        backend.load(self.model)
+        return backend
+
+    def getValues(self):
+        return self.result.x.tolist()
+
+    def getObjectiveValue(self):
+        return -self.result.fun if self.model.maximize else self.result.fun
+
+    def getStatistics(self):
+        m = self.model
+        return {"rows": m.numRows, "columns": m.numCols, "nonzeros": int(sum(len(v) for v in m.values)),
+                "iterations": int(self.result.nit) if self.result != 0 else 0}
+
+    # There is no lp file writer, the model arrays are saved instead (always compressed)
+    def write(self, filename, compressed=True):
+        m = self.model
+        rows, cols, vals = m.getCoefficients()
+        np.savez_compressed(filename + ".npz", obj=m.getObjective(), lb=m.getLowerBounds(), ub=m.getUpperBounds(),
+                            senses=np.array(list(m.getSenses())), rhs=m.getRhs(), rows=rows, cols=cols, vals=vals)
@@ -0,0 +1,125 @@
+import json
+import os
+import time
+from src.inputdata.Parameters import Parameters as params
+
+try:
+    import resource
+except ImportError:
+    resource = None  # not available on Windows, the process peak memory is not recorded
+
+
+# Optional per phase instrumentation of the planner and the solvers (Parameters.instrumentation).
+# Each scope ("planner", "deterministic", "robust") is opened with begin, every mark closes a phase (the wall
+# time since the previous mark) and end writes the record as a JSON line, with the model dimensions and
+# solver iterations of the backend (if any) and the memory:
+#   - peakMemoryMB: the peak resident memory during the scope. On Linux begin resets the high water mark of the
+#     process (/proc/self/clear_refs) and end reads it (VmHWM of /proc/self/status); the peaks of the inner scopes
+#     are folded into the open outer ones, as their reset loses them,
+#   - memoryMB and memoryDeltaMB: the resident memory at the end of the scope and its change over the scope,
+#   - processPeakMemoryMB: only where the high water mark cannot be reset, the peak of the whole process so far
+#     (ru_maxrss, which the reset also clears on Linux).
+# When it is off every call returns right away.
+class Instrumentation:
+    records = {}  # scope -> (record, time of the last mark)
+    output = None
+
+    @staticmethod
+    def begin(scope, day=None):
+        if not params.instrumentation:
+            return
+        record = {"scope": scope, "day": day, "pid": os.getpid(), "phases": {},
+                  "uncertainty": params.currentUncertainty, "robustness": params.currentRobustness,
+                  "repositionInterval": params.currentRepositionInterval, "leadTime": params.currentLeadTime}
+        memory = Instrumentation.getCurrentMemory()
+        if memory is not None:
+            record["memoryMB"] = memory
+        Instrumentation.updatePeaks()
+        if Instrumentation.resetHighWaterMark():
+            record["peakMemoryMB"] = Instrumentation.getHighWaterMark()
+        Instrumentation.records[scope] = (record, time.time())
+
+    @staticmethod
+    def mark(scope, phase):
+        if not params.instrumentation or scope not in Instrumentation.records:
+            return
+        record, last = Instrumentation.records[scope]
+        now = time.time()
+        record["phases"][phase] = record["phases"].get(phase, 0.0) + (now - last)
+        Instrumentation.records[scope] = (record, now)
+
+    @staticmethod
+    def end(scope, backend=0, **fields):
+        if not params.instrumentation or scope not in Instrumentation.records:
+            return
+        Instrumentation.updatePeaks()
+        record, last = Instrumentation.records.pop(scope)
+        record["time"] = sum(record["phases"].values())
+        if backend != 0:
+            record.update(backend.getStatistics())
+        memory = Instrumentation.getCurrentMemory()
+        if memory is not None:
+            record["memoryDeltaMB"] = memory - record.get("memoryMB", memory)
+            record["memoryMB"] = memory
+        if resource is not None and "peakMemoryMB" not in record:
+            record["processPeakMemoryMB"] = Instrumentation.getProcessPeakMemory()
+        record.update(fields)
+        Instrumentation.write(record)
+
+    # Resident memory of the process in MB, None where there is no /proc
+    @staticmethod
+    def getCurrentMemory():
+        try:
+            f = open("/proc/self/statm")
+            pages = int(f.read().split()[1])
+            f.close()
+        except (IOError, OSError):
+            return None
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024.0 * 1024.0)
+
+    # Raises the peak memory of the open scopes to the high water mark since the last reset
+    @staticmethod
+    def updatePeaks():
+        peak = Instrumentation.getHighWaterMark()
+        for record, last in Instrumentation.records.values():
+            if "peakMemoryMB" in record and peak is not None:
+                record["peakMemoryMB"] = max(record["peakMemoryMB"], peak)
+
+    # Resets the high water mark of the process to its current resident memory, False if it is not supported
+    @staticmethod
+    def resetHighWaterMark():
+        try:
+            f = open("/proc/self/clear_refs", "w")
+            f.write("5")
+            f.close()
+        except (IOError, OSError):
+            return False
+        return Instrumentation.getHighWaterMark() is not None
+
+    # High water mark (peak resident memory since the last reset) in MB, None where there is no /proc
+    @staticmethod
+    def getHighWaterMark():
+        try:
+            f = open("/proc/self/status")
+            lines = [line for line in f if line.startswith("VmHWM:")]
+            f.close()
+        except (IOError, OSError):
+            return None
+        return int(lines[0].split()[1]) / 1024.0 if lines else None
+
+    # Peak resident memory of the process so far in MB (ru_maxrss is in KB on Linux and in bytes on macOS)
+    @staticmethod
+    def getProcessPeakMemory():
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024.0 * 1024.0) if os.uname()[0] == "Darwin" else peak / 1024.0
+
+    @staticmethod
+    def write(record):
+        if Instrumentation.output is None:
+            path = os.path.dirname(params.instrumentationFile)
+            if path != "" and not os.path.exists(path):
+                os.makedirs(path)
+            Instrumentation.output = open(params.instrumentationFile, "a")
+
+        Instrumentation.output.write(json.dumps(record, sort_keys=True) + "\n")
+        Instrumentation.output.flush()
@@ -0,0 +1,50 @@
+from src.inputdata.Parameters import Parameters as params
+
+
+# Common interface of the lp engines used by DeterministicSolver and RobustSolver.
+# A backend loads a ModelMatrix, solves it and gives back the primal values.
+class LpBackend:
+    name = ""
+
+    def __init__(self):
+        self.lp = 0  # native cplex model, only available on the cplex backend
+
+    def load(self, model):
+        raise NotImplementedError
+
+    def solve(self):
+        raise NotImplementedError
+
+    def getValues(self):
+        raise NotImplementedError
+
+    def getObjectiveValue(self):
+        raise NotImplementedError
+
+    def write(self, filename, compressed=False):
+        raise NotImplementedError
+
+    # Model dimensions (rows, columns, nonzeros) and iterations of the last solve
+    def getStatistics(self):
+        raise NotImplementedError
+
+    # Independent copy of the loaded model that can be written from another thread
+    def snapshot(self):
+        raise NotImplementedError
+
+    # Creates the backend configured in Parameters.lpBackend (or the given one).
+    # The engines are imported here, so CPLEX is only needed when it is actually used.
+    @staticmethod
+    def create(name=None):
+        name = params.lpBackend if name is None else name
+        try:
+            if name == "cplex":
+                from CplexBackend import CplexBackend
+                return CplexBackend()
+            if name == "highs":
+                from HighsBackend import HighsBackend
+                return HighsBackend()
+        except ImportError as e:
+            raise ImportError("The " + name + " lp backend is not available (" + str(e) + "), install its python " +
+                              "package (cplex or scipy) or change Parameters.lpBackend")
+        raise ValueError("Unknown lp backend: " + str(name))
@@ -0,0 +1,76 @@
+import os
+import atexit
+import threading
+from src.inputdata.Parameters import Parameters as params
+
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+
+# Optional lp model export. The model is copied on the calling thread and written, compressed, by a background
+# writer thread, so disk I/O does not add to the planning day latency.
+# Modes (Parameters.lpExportMode): "off", "interval" (every lpExportInterval-th day) or "failures" (only when
+# the solve fails).
+# The planners call flush at the end of every experiment: the atexit drain only runs in the main process, the
+# multiprocessing workers exit through os._exit.
+class LpExporter:
+    jobs = None
+    thread = None
+
+    @staticmethod
+    def export(backend, prefix, day, failed=False):
+        if backend == 0 or not LpExporter.isExported(day, failed):
+            return
+
+        filename = os.path.join(params.lpExportDir, prefix + "_dia" + str(day) + "_Error" + str(params.currentUncertainty) +
+                                "_Robustness" + str(params.currentRobustness) + "_RepositionInterval" +
+                                str(params.currentRepositionInterval) + "_LeadTime" + str(params.currentLeadTime) + ".lp")
+        try:
+            snapshot = backend.snapshot()
+        except Exception as e:
+            print "Error copying the lp for " + filename + ": " + str(e)
+            return
+
+        LpExporter.start()
+        LpExporter.jobs.put((snapshot, filename))
+
+    @staticmethod
+    def isExported(day, failed):
+        if params.lpExportMode == "interval":
+            return (day - params.initialDay) % params.lpExportInterval == 0
+        if params.lpExportMode == "failures":
+            return failed
+        return False
+
+    @staticmethod
+    def start():
+        if LpExporter.thread is not None:
+            return
+
+        if not os.path.exists(params.lpExportDir):
+            os.makedirs(params.lpExportDir)
+
+        LpExporter.jobs = queue.Queue()
+        LpExporter.thread = threading.Thread(target=LpExporter.run)
+        LpExporter.thread.daemon = True
+        LpExporter.thread.start()
+        atexit.register(LpExporter.flush)
+
+    @staticmethod
+    def run():
+        while True:
+            snapshot, filename = LpExporter.jobs.get()
+            try:
+                snapshot.write(filename, compressed=True)
+            except Exception as e:
+                print "Error writing " + filename + ": " + str(e)
+            finally:
+                LpExporter.jobs.task_done()
+
+    # Waits until all the queued models are written
+    @staticmethod
+    def flush():
+        if LpExporter.jobs is not None:
+            LpExporter.jobs.join()
@@ -0,0 +1,4 @@
+# Raised by the lp backends when a model cannot be solved, the solvers then keep the plan of the previous day
+# for that day instead of stopping the run (see DeterministicSolver.solve and RobustSolver.solve)
+class LpSolveError(RuntimeError):
+    pass
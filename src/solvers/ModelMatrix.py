@@ -0,0 +1,77 @@
+import numpy as np
+
+
+# Solver independent sparse representation of a linear program.
+# Columns and rows are appended in blocks and the coefficients are kept as
+# (row, col, val) triplets, so a whole model can be pushed to the solver
+# with a handful of bulk calls instead of one call per variable/constraint.
+class ModelMatrix:
+
+    infinity = 1.0e+20  # same value used by cplex.infinity
+
+    def __init__(self, maximize=False):
+        self.maximize = maximize
+        self.numCols = 0
+        self.numRows = 0
+        self.obj = []
+        self.lb = []
+        self.ub = []
+        self.colNames = []
+        self.senses = []
+        self.rhs = []
+        self.rowNames = []
+        self.rowInd = []
+        self.colInd = []
+        self.values = []
+
+    # Appends a block of columns and returns the index of the first one
+    def addColumns(self, count, obj=0.0, lb=0.0, ub=infinity, names=None):
+        base = self.numCols
+        self.obj.append(np.broadcast_to(np.asarray(obj, dtype=float), (count,)))
+        self.lb.append(np.broadcast_to(np.asarray(lb, dtype=float), (count,)))
+        self.ub.append(np.broadcast_to(np.asarray(ub, dtype=float), (count,)))
+        if names is not None:
+            self.colNames.extend(names)
+        self.numCols += count
+        return base
+
+    # Appends a block of rows and returns the index of the first one
+    def addRows(self, count, sense, rhs=0.0, names=None):
+        base = self.numRows
+        self.senses.append(np.broadcast_to(np.asarray(sense, dtype="S1"), (count,)))
+        self.rhs.append(np.broadcast_to(np.asarray(rhs, dtype=float), (count,)))
+        if names is not None:
+            self.rowNames.extend(names)
+        self.numRows += count
+        return base
+
+    # Appends coefficients, arguments are broadcast against each other
+    def addCoefficients(self, rows, cols, vals):
+        rows, cols, vals = np.broadcast_arrays(np.asarray(rows, dtype=int), np.asarray(cols, dtype=int),
+                                               np.asarray(vals, dtype=float))
+        self.rowInd.append(rows.ravel())
+        self.colInd.append(cols.ravel())
+        self.values.append(vals.ravel())
+
+    def getObjective(self):
+        return self.concat(self.obj, float)
+
+    def getLowerBounds(self):
+        return self.concat(self.lb, float)
+
+    def getUpperBounds(self):
+        return self.concat(self.ub, float)
+
+    def getSenses(self):
+        return "".join(s.decode() for s in self.concat(self.senses, "S1"))
+
+    def getRhs(self):
+        return self.concat(self.rhs, float)
+
+    def getCoefficients(self):
+        return self.concat(self.rowInd, int), self.concat(self.colInd, int), self.concat(self.values, float)
+
+    def concat(self, blocks, dtype):
+        if len(blocks) == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.concatenate(blocks)
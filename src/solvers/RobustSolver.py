@@ -0,0 +1,721 @@
+import numpy as np
+from Variable import Variable
+from ModelMatrix import ModelMatrix
+from ColumnRegistry import ColumnRegistry
+from LpBackend import LpBackend
+from LpSolveError import LpSolveError
+from LpExporter import LpExporter
+from Instrumentation import Instrumentation
+from src.inputdata.Parameters import Parameters as params
+from src.inputdata.ScenarioSet import ScenarioSet
+from src.inputdata.RandomStreams import RandomStreams
+from src.inputdata.ScenarioReducer import ScenarioReducer
+from src.inputdata.ProblemData import ProblemData as pdata
+from src.solutiondata.ProblemSolution import ProblemSolution
+
+
+# IN THIS EXAMPLE WE ARE WORKING WITH JUST ONE STORE AND ONE PRODUCT
+# 1 time instant = 1 day
+# ToDo: parametrize time period discretization
+
+class RobustSolver:
+    # planning state carried from one day to the next
+    stateFields = ("repositions", "initialStock", "plannedRepositions", "plannedStocks", "plannedFaults",
+                   "reductionErrors", "scenarioPlans", "failedDays")
+
+    def __init__(self, pData, streams=None):
+        self.pData = pData
+        self.streams = RandomStreams() if streams is None else streams  # the scenarios of each day have their own
+        self.scenarios = 0
+        self.currentDay = params.initialDay
+        self.finalDay = self.currentDay + params.horizon
+        self.repositions = [0 for i in range(0, pData.numDays)]  # the amounts repositioned to stock for each day
+        self.initialStock = [0 for i in range(0, pData.numDays)]  # the initial stock at each iteration
+        self.plannedRepositions = [[0 for i in range(pData.numDays)] for t in range(params.horizon)]
+        self.plannedStocks = [[0 for i in range(pData.numDays)] for t in range(params.horizon)]
+        self.plannedFaults = [[0 for i in range(pData.numDays)] for t in range(params.horizon)]
+        self.failedDays = []  # days whose lp could not be solved, they kept the plan of the previous day
+        self.reductionErrors = [0 for i in range(0, pData.numDays)]  # scenario reduction error of each day
+        self.scenarioPlans = {}  # day -> (stocks, faults, restrictive scenarios) if params.keepScenarioPlans
+        self.lp = 0
+        self.backend = 0
+        self.variables = {}  # only used by the per variable model creation, see ColumnRegistry
+        self.columns = 0
+        self.numCols = 0
+        self.problemSolution = 0
+
+    def createScenarios(self):
+        self.scenarios = ScenarioSet(self.pData, self.currentDay, rng=self.streams.get("scenarios", self.currentDay))
+
+        # shrink the generated scenarios to a small representative set
+        if 0 < params.reducedScenarios < len(self.scenarios):
+            numGenerated = len(self.scenarios)
+            reducer = ScenarioReducer()
+            self.scenarios = reducer.reduce(self.scenarios)
+            self.reductionErrors[self.currentDay] = reducer.error
+            print "Reduced " + str(numGenerated) + " scenarios to " + str(len(self.scenarios)) + \
+                  " for day " + str(self.currentDay) + ", error " + '{:.2f}'.format(reducer.error)
+
+    # Creates the linear program
+    def createModel(self):
+        # the per variable/row creation talks to cplex directly, the other backends only take a ModelMatrix
+        # (bulkModelBuild = False is ignored by them)
+        if self.lp == 0 or params.bulkModelBuild or params.incrementalModel or params.lazyScenarios:
+            self.createBulkModel()
+        else:
+            self.lp.objective.set_sense(self.lp.objective.sense.maximize)
+            self.createVariables()
+            self.createConstraints()
+
+            # same column layout as the bulk model
+            numScenarios = len(self.scenarios)
+            horizon = self.finalDay - self.currentDay
+            repositionDays = self.getRepositionDays()
+            self.setRepositionColumns(0, repositionDays)
+            self.fBase = len(repositionDays)
+            self.sBase = self.fBase + (numScenarios * horizon)
+            self.zsBase = self.sBase + (numScenarios * horizon)
+            self.zBase = self.zsBase + (2 * numScenarios)
+            self.registerColumns(repositionDays)
+
+    #region Bulk Model Creation
+    # Builds the same model as createVariables/createConstraints, but the columns, rows and coefficients
+    # are computed as arrays and pushed to the lp backend in a few bulk calls.
+    # Column layout: r | f (scenario x t) | s (scenario x t) | zsp, zsn (per scenario) | zp, zn
+    # Row layout: initial stock (scenario) | stock flow (scenario x t) | foValue (scenario) | robust (scenario)
+    def createBulkModel(self):
+        numScenarios = len(self.scenarios)
+        horizon = self.finalDay - self.currentDay
+        days = np.arange(self.currentDay, self.finalDay)
+        forecast = self.scenarios.forecast
+        repositionDays = self.getRepositionDays()
+
+        # in incremental mode the model keeps the same structure for every day, so there is a reposition column
+        # for each t of the horizon and the ones that are not reposition days are fixed to zero by their bound.
+        # Names are only given when the lp can be exported (they would not follow the days in incremental mode).
+        named = params.lpExportMode != "off" and not params.incrementalModel
+        scenarioIds = self.scenarios.ids
+        rDays = list(days) if params.incrementalModel else repositionDays
+        m = ModelMatrix(maximize=True)
+
+        # the initial stock is the same for all scenarios
+        self.computeInitialStock()
+
+        # columns
+        rBase = m.addColumns(len(rDays), ub=self.getRepositionUpperBounds(rDays))
+        self.fBase = m.addColumns(numScenarios * horizon)
+        self.sBase = m.addColumns(numScenarios * horizon)
+        self.zsBase = m.addColumns(2 * numScenarios)
+        self.zBase = m.addColumns(2, obj=[1.0, -1.0])
+        self.setRepositionColumns(rBase, rDays)
+        self.registerColumns(repositionDays)
+        if named:
+            m.colNames = self.columns.getNames(m.numCols)
+
+        scenarioIndex = np.arange(numScenarios)[:, np.newaxis]
+        fCol = self.columns.getColumns("f")
+        sCol = self.columns.getColumns("s")
+        zspCol = self.columns.getColumns("zsp")[:, 0]
+        zsnCol = self.columns.getColumns("zsn")[:, 0]
+        flowRhs, foRhs = self.getBulkRhs(forecast)
+
+        # initial stock: s_{s,t0} = initial stock
+        base = m.addRows(numScenarios, "E", self.initialStock[self.currentDay],
+                         names=["initial_stock_" + sid for sid in scenarioIds] if named else None)
+        m.addCoefficients(base + np.arange(numScenarios), sCol[:, 0], 1.0)
+
+        # stock flow: s_{s,t} + r_{t-L+1} + f_{s,t} - s_{s,t+1} = d_{s,t}
+        numFlows = horizon - 1
+        base = m.addRows(numScenarios * numFlows, "E", flowRhs.ravel(),
+                         names=["stock_flow_" + sid + "_" + str(t) for sid in scenarioIds for t in days[:numFlows]]
+                         if named else None)
+        flowRows = base + (scenarioIndex * numFlows) + np.arange(numFlows)
+        m.addCoefficients(flowRows, sCol[:, :numFlows], 1.0)
+        m.addCoefficients(flowRows, fCol[:, :numFlows], 1.0)
+        m.addCoefficients(flowRows, sCol[:, 1:], -1.0)
+
+        lagCol = self.getLagColumns()
+        hasR = lagCol >= 0
+        m.addCoefficients(flowRows[:, hasR], lagCol[hasR], 1.0)
+
+        # objective value of each scenario: zsp - zsn + sum_t (cs*s + cr*r + cf*f) = sum_t p*d
+        base = m.addRows(numScenarios, "E", foRhs, names=["foValue_" + sid for sid in scenarioIds] if named else None)
+        foRows = base + np.arange(numScenarios)
+        m.addCoefficients(foRows, zspCol, 1.0)
+        m.addCoefficients(foRows, zsnCol, -1.0)
+        m.addCoefficients(foRows[:, np.newaxis], sCol, params.unitStockageCost)
+        m.addCoefficients(foRows[:, np.newaxis], fCol, params.productAbscenceCost)
+        m.addCoefficients(foRows[:, np.newaxis], self.rCol[self.rCol >= 0], params.unitCost)
+
+        # robustness: zp - zn - zsp + zsn <= 0
+        base = m.addRows(numScenarios, "L", 0.0, names=["robust_" + sid for sid in scenarioIds] if named else None)
+        robustRows = base + np.arange(numScenarios)
+        m.addCoefficients(robustRows, self.zBase, 1.0)
+        m.addCoefficients(robustRows, self.zBase + 1, -1.0)
+        m.addCoefficients(robustRows, zspCol, -1.0)
+        m.addCoefficients(robustRows, zsnCol, 1.0)
+
+        self.backend.load(m)
+        self.numCols = m.numCols
+
+    # Shifts a model created in incremental mode to the current day. Only the right hand sides and the
+    # reposition bounds change from one day to the next, so the objective and the matrix are left untouched.
+    def updateBulkModel(self):
+        forecast = self.scenarios.forecast
+        repositionDays = self.getRepositionDays()
+        self.computeInitialStock()
+
+        flowRhs, foRhs = self.getBulkRhs(forecast)
+        initialRhs = np.full(len(self.scenarios), float(self.initialStock[self.currentDay]))
+        rhs = np.concatenate((initialRhs, flowRhs.ravel(), foRhs))
+        self.lp.linear_constraints.set_rhs(list(enumerate(rhs.tolist())))
+
+        days = range(self.currentDay, self.finalDay)
+        self.lp.variables.set_upper_bounds(list(zip(self.rCol.tolist(), self.getRepositionUpperBounds(days).tolist())))
+
+        self.registerColumns(repositionDays)
+
+    def getRepositionDays(self):
+        return [rDay for rDay in self.pData.repositionDays if rDay >= self.currentDay and rDay < self.finalDay]
+
+    def getRepositionUpperBounds(self, days):
+        isRepositionDay = np.isin(np.array(days, dtype=int), self.pData.repositionDays)
+        return np.where(isRepositionDay, ModelMatrix.infinity, 0.0)
+
+    # Reposition column that arrives on each stock flow row (t-L+1), -1 when it is not part of the model
+    def getLagColumns(self):
+        horizon = self.finalDay - self.currentDay
+        lagDays = np.arange(self.currentDay, self.finalDay - 1) - params.currentLeadTime + 1
+        inHorizon = lagDays >= self.currentDay
+        return np.where(inHorizon, self.rCol[np.clip(lagDays - self.currentDay, 0, horizon - 1)], -1)
+
+    # Right hand sides of the stock flow and foValue rows
+    def getBulkRhs(self, forecast):
+        numFlows = forecast.shape[1] - 1
+        lagDays = np.arange(self.currentDay, self.finalDay - 1) - params.currentLeadTime + 1
+        hasR = self.getLagColumns() >= 0
+
+        # repositions decided on previous iterations go to the right hand side
+        flowRhs = forecast[:, :numFlows].copy()
+        fromPast = np.logical_and(~hasR, lagDays >= 0)
+        flowRhs[:, fromPast] -= np.array(self.repositions, dtype=float)[lagDays[fromPast]]
+
+        foRhs = params.unitPrice * forecast.sum(axis=1)
+        return flowRhs, foRhs
+
+    # Column index of the reposition variable for each t of the horizon (-1 when there is none), the reposition
+    # columns start at rBase, one for each of rDays
+    def setRepositionColumns(self, rBase, rDays):
+        self.rCol = np.full(self.finalDay - self.currentDay, -1, dtype=int)
+        self.rCol[np.array(rDays, dtype=int) - self.currentDay] = rBase + np.arange(len(rDays))
+
+    # Column registry of the model (layout r | f | s | zsp, zsn | zp, zn), only the reposition days have an r variable
+    def registerColumns(self, repositionDays):
+        numScenarios = len(self.scenarios)
+        horizon = self.finalDay - self.currentDay
+        rTable = np.full(horizon, -1, dtype=int)
+        k = np.array(repositionDays, dtype=int) - self.currentDay
+        rTable[k] = self.rCol[k]
+
+        self.columns = ColumnRegistry(self.currentDay, self.scenarios.ids)
+        self.columns.addTable("r", Variable.v_reposition, rTable, nameFormat="r_{t}")
+        self.columns.addFamily("f", Variable.v_fault, self.fBase, horizon, numScenarios, nameFormat="f_{s}_{t}")
+        self.columns.addFamily("s", Variable.v_stock, self.sBase, horizon, numScenarios, nameFormat="s_{s}_{t}")
+        self.columns.addFamily("zsp", Variable.v_zsp, self.zsBase, numScenarios=numScenarios, scenarioStride=2,
+                               nameFormat="zsp_{s}")
+        self.columns.addFamily("zsn", Variable.v_zsn, self.zsBase + 1, numScenarios=numScenarios, scenarioStride=2,
+                               nameFormat="zsn_{s}")
+        self.columns.addFamily("zp", Variable.v_zp, self.zBase)
+        self.columns.addFamily("zn", Variable.v_zn, self.zBase + 1)
+    #endregion
+
+    #region Lazy Scenario Generation
+    # Solves the max-min model with a small subset of the scenarios, evaluates the reposition plan against every
+    # scenario and adds the most violated ones (value below the lp objective z) until none is violated.
+    # The lp objective is an upper bound of the full model, so the final plan is optimal for all the scenarios.
+    def solveLazy(self):
+        allScenarios = self.scenarios
+        active = self.getInitialLazyScenarios()
+        iterations = 0
+
+        while True:
+            iterations += 1
+            self.scenarios = allScenarios.subset(active)
+
+            # the number of scenarios changes on each iteration, so the model is always rebuilt
+            self.lp = 0
+            self.createLp()
+            self.backend.solve()
+            x = np.array(self.backend.getValues())
+
+            z = x[self.zBase] - x[self.zBase + 1]
+            r = np.where(self.rCol >= 0, x[np.maximum(self.rCol, 0)], 0.0)
+            values, stocks, faults = self.evaluatePlan(allScenarios.forecast, r)
+
+            tolerance = 1e-6 * max(1.0, abs(z))
+            violated = np.flatnonzero(values < z - tolerance)
+            violated = violated[~np.isin(violated, active)]
+            if len(violated) == 0:
+                break
+
+            worst = violated[np.argsort(values[violated])][:params.lazyScenariosPerIteration]
+            active = np.concatenate((active, worst))
+
+        print "Lazy scenarios for day " + str(self.currentDay) + ": " + str(len(active)) + " of " + \
+              str(len(allScenarios)) + " scenarios, " + str(iterations) + " iterations"
+
+        self.scenarios = allScenarios
+        self.savePlan(r, stocks, faults, self.getRestrictiveScenarios(values, z))
+
+    # Starts with the scenarios of lowest and highest total demand
+    def getInitialLazyScenarios(self):
+        order = np.argsort(self.scenarios.forecast.sum(axis=1))
+        count = min(params.lazyInitialScenarios, len(order))
+        return np.unique(np.concatenate((order[:(count + 1) // 2], order[len(order) - (count // 2):])))
+
+    # Objective value, stocks and faults of every scenario for a reposition plan r (one value per day of the
+    # horizon). Faults are only used for the demand that the stock cannot attend, which is the best recourse.
+    def evaluatePlan(self, forecast, r):
+        numScenarios, horizon = forecast.shape
+        lagDays = np.arange(self.currentDay, self.finalDay - 1) - params.currentLeadTime + 1
+        lagCol = self.getLagColumns()
+
+        # arrivals on each stock flow row: planned repositions or the ones decided on previous iterations
+        arrivals = np.zeros(horizon - 1)
+        hasR = lagCol >= 0
+        arrivals[hasR] = r[lagDays[hasR] - self.currentDay]
+        fromPast = np.logical_and(~hasR, lagDays >= 0)
+        arrivals[fromPast] = np.array(self.repositions, dtype=float)[lagDays[fromPast]]
+
+        stocks = np.zeros((numScenarios, horizon))
+        faults = np.zeros((numScenarios, horizon))
+        stocks[:, 0] = self.initialStock[self.currentDay]
+        for k in range(horizon - 1):
+            available = stocks[:, k] + arrivals[k]
+            faults[:, k] = np.maximum(0, forecast[:, k] - available)
+            stocks[:, k+1] = np.maximum(0, available - forecast[:, k])
+
+        values = (params.unitPrice * forecast.sum(axis=1)) - (params.unitStockageCost * stocks.sum(axis=1)) - \
+                 (params.productAbscenceCost * faults.sum(axis=1)) - (params.unitCost * r.sum())
+        return values, stocks, faults
+
+    #endregion
+
+    #region Solution
+    # Plan of a day whose lp could not be solved: the repositions the previous day planned for the days of this
+    # one (none on the first day), the planned stocks and faults are left empty
+    def keepPreviousPlan(self):
+        day = self.currentDay
+        self.failedDays.append(day)
+        if day > params.initialDay:
+            for t in self.getRepositionDays():
+                self.plannedRepositions[day][t] = self.plannedRepositions[day - 1][t]
+            self.repositions[day] = self.plannedRepositions[day - 1][day]
+
+    # Saves the plan of the restrictive scenario (the first of the restrictive ones): r is given for each day of
+    # the horizon (only read on the reposition days), stocks and faults for each scenario and day
+    def savePlan(self, r, stocks, faults, restrictive):
+        day = self.currentDay
+        self.plannedStocks[day][day:self.finalDay] = stocks[restrictive[0]].tolist()
+        self.plannedFaults[day][day:self.finalDay] = faults[restrictive[0]].tolist()
+
+        for t in self.getRepositionDays():
+            if t == day:
+                self.repositions[day] = float(r[t - day])
+            self.plannedRepositions[day][t] = float(r[t - day])
+
+        if params.keepScenarioPlans:
+            self.scenarioPlans[day] = (stocks, faults, restrictive)
+
+    # Scenarios whose value is the max-min objective z (within a tolerance), from the lowest valued one.
+    # Only the lowest valued scenario if the solution is not accurate enough to find any.
+    def getRestrictiveScenarios(self, values, z):
+        tolerance = 1e-6 * max(1.0, abs(z))
+        restrictive = np.flatnonzero(values <= z + tolerance)
+        if len(restrictive) == 0:
+            return np.array([np.argmin(values)])
+        return restrictive[np.argsort(values[restrictive], kind="mergesort")]
+
+    def saveSolution(self, x):
+        # the columns of each family are read as one slice of the solution, (scenarios x days) for f and s
+        x = np.asarray(x, dtype=float)
+        stocks = x[self.columns.getColumns("s")]
+        faults = x[self.columns.getColumns("f")]
+        r = np.where(self.rCol >= 0, x[np.maximum(self.rCol, 0)], 0.0)
+
+        # the restrictive scenario is the one with the lowest value zsp - zsn, which bounds z = zp - zn
+        values = x[self.columns.getColumns("zsp")[:, 0]] - x[self.columns.getColumns("zsn")[:, 0]]
+        z = x[self.columns.getColumn("zp")] - x[self.columns.getColumn("zn")]
+        self.savePlan(r, stocks, faults, self.getRestrictiveScenarios(values, z))
+    #endregion
+
+    #region Variable Creation
+    def createVariables(self):
+        numVars = 0
+        numVars += self.createRepositionVariable()
+        numVars += self.createFVariable()
+        numVars += self.createStockVariable()
+        numVars += self.createZSVariables()
+        numVars += self.createZVariables()
+
+    def createRepositionVariable(self):
+        numVars = 0
+        repositionDays = [rDay for rDay in self.pData.repositionDays if rDay >= self.currentDay and rDay < self.finalDay]
+
+        # get the maximum forecast for using it as upper bound for r variable
+        maxDemand = self.scenarios.maxForecast
+
+        # The reposition variable remains only for each t in the current planning horizon
+        for i in repositionDays:
+            v = Variable()
+            v.type = Variable.v_reposition
+            v.name = "r_" + str(i)
+            v.col = self.numCols
+            v.instant = i
+            self.variables[v.name] = v
+            self.lp.variables.add(names=[v.name])
+            self.numCols += 1
+            numVars += 1
+
+        return numVars
+
+    def createFVariable(self):
+        numVars = 0
+
+        # the f variables are for each scenario and for each t of current horizon
+        for sid in self.scenarios.ids:
+            for t in range(self.currentDay, self.finalDay):
+                # create the variable
+                v = Variable()
+                v.type = Variable.v_fault
+                v.name = "f_" + sid + "_" + str(t)
+                v.col = self.numCols
+                v.instant = t
+                v.scenario = sid
+                self.variables[v.name] = v
+                self.lp.variables.add(names=[v.name])
+                self.numCols += 1
+                numVars += 1
+
+        return numVars
+
+    def createStockVariable(self):
+        numVars = 0
+
+        # the s variables are for each scenario and for each t of current horizon
+        for sid in self.scenarios.ids:
+            for t in range(self.currentDay, self.finalDay):
+                # create the variable
+                v = Variable()
+                v.type = Variable.v_stock
+                v.name = "s_" + sid + "_" + str(t)
+                v.col = self.numCols
+                v.instant = t
+                v.scenario = sid
+                self.variables[v.name] = v
+                self.lp.variables.add(names=[v.name])
+                self.numCols += 1
+                numVars += 1
+
+        return numVars
+
+    def createZSVariables(self):
+        numVars = 0
+        # the z variable is for each scenario
+        for sid in self.scenarios.ids:
+
+            # create zsp variable
+            v1 = Variable()
+            v1.type = Variable.v_zsp
+            v1.name = "zsp_" + sid
+            v1.col = self.numCols
+            v1.scenario = sid
+            self.variables[v1.name] = v1
+            self.lp.variables.add(names=[v1.name])
+            self.numCols += 1
+            numVars += 1
+
+            #create zsn variable
+            v2 = Variable()
+            v2.type = Variable.v_zsn
+            v2.name = "zsn_" + sid
+            v2.col = self.numCols
+            v2.scenario = sid
+            self.variables[v2.name] = v2
+            self.lp.variables.add(names=[v2.name])
+            self.numCols += 1
+            numVars += 1
+
+        return numVars
+
+    def createZVariables(self):
+        numVars = 0
+
+        # create the zp variable
+        v1 = Variable()
+        v1.type = Variable.v_zp
+        v1.name = "zp"
+        v1.col = self.numCols
+        self.variables[v1.name] = v1
+        self.lp.variables.add(obj=[1.0], names=[v1.name])
+        self.numCols += 1
+        numVars += 1
+
+        # create the zn variable
+        v2 = Variable()
+        v2.type = Variable.v_zn
+        v2.name = "zn"
+        v2.col = self.numCols
+        self.variables[v2.name] = v2
+        self.lp.variables.add(obj=[-1.0], names=[v2.name])
+        self.numCols += 1
+        numVars += 1
+
+        return numVars
+
+    def getVariable(self, vname):
+        if vname in self.variables:
+            return self.variables[vname]
+        if self.columns != 0:
+            return self.columns.getVariable(vname)
+        return 0
+    #endregion
+
+    #region Constraint Creation
+    def createConstraints(self):
+        numConst = 0
+        numConst += self.createInitialStockConstraint()
+        numConst += self.createStockFlowConstraint()
+        numConst += self.createFOScenarioConstraint()
+        numConst += self.createRobustConstraint()
+
+    def computeInitialStock(self):
+        t = self.currentDay
+        if t == params.initialDay:
+            self.initialStock[t] = self.pData.getInitialStock()
+        else:
+            self.initialStock[t] = self.initialStock[t-1] - self.pData.demand[t-1]
+            if t - params.currentLeadTime > 0:
+                self.initialStock[t] += self.repositions[t-params.currentLeadTime]
+
+        self.initialStock[t] = max(0, self.initialStock[t])
+
+    def createInitialStockConstraint(self):
+        numCons = 0
+
+        # get the initial stock value for the current day, which will be the same for all scenarios.
+        self.computeInitialStock()
+
+        # this constraint is current day, for each scenario
+        for sid in self.scenarios.ids:
+            # get the initial stock variable for current day and scenario
+            v = self.variables["s_" + sid + "_"  + str(self.currentDay)]
+            mind = [v.col]
+            mval = [1.0]
+            self.createConstraint(mind,mval,"E",self.initialStock[self.currentDay],"initial_stock_" + sid)
+            numCons += 1
+
+        return numCons
+
+    def createStockFlowConstraint(self):
+        numCons = 0
+        # s_{s,t} + r_{t-1} + f_{s,t} - s_{s,t+1} = d_{s,t}
+
+        # this constraint is for each scenatio and each t in the horizon
+        for sc, sid in enumerate(self.scenarios.ids):
+            for t in range(self.currentDay, self.finalDay-1):
+                # get the associated demand
+                rhs = self.scenarios.getForecast(sc, t)
+
+                mind = []
+                mval = []
+
+                s = self.getVariable("s_" + sid + "_" + str(t))
+                s1 = self.getVariable("s_" + sid + "_" + str(t+1))
+                f = self.getVariable("f_" + sid + "_" + str(t))
+                r = self.getVariable("r_" + str(t-params.currentLeadTime+1))
+
+                mind.append(s.col)
+                mval.append(1.0)
+                mind.append(f.col)
+                mval.append(1.0)
+
+                if s1 != 0:
+                    mind.append(s1.col)
+                    mval.append(-1.0)
+
+                if r != 0:
+                    mind.append(r.col)
+                    mval.append(1.0)
+                elif (t-params.currentLeadTime+1) >= 0:
+                    rhs -= self.repositions[t-params.currentLeadTime+1]
+
+                self.createConstraint(mind,mval,"E",rhs,"stock_flow_" + sid + "_" + str(t))
+                numCons += 1
+
+        return numCons
+
+    def createFOScenarioConstraint(self):
+        numCons = 0
+
+        # this constraint is for each scenario
+        for sc, sid in enumerate(self.scenarios.ids):
+            mind = []
+            mval = []
+            rhs = 0
+
+            # get the zsp variable
+            zsp = self.getVariable("zsp_" + sid)
+            mind.append(zsp.col)
+            mval.append(1.0)
+
+            # get the zpn variable
+            zsn = self.getVariable("zsn_" + sid)
+            mind.append(zsn.col)
+            mval.append(-1.0)
+
+            # get other variables, for each t
+            for t in range(self.currentDay, self.finalDay):
+                s = self.getVariable("s_" + sid + "_" + str(t))
+                r = self.getVariable("r_" + str(t))
+                f = self.getVariable("f_" + sid + "_" + str(t))
+
+                mind.append(s.col)
+                mval.append(params.unitStockageCost)
+
+                if r != 0:
+                    mind.append(r.col)
+                    mval.append(params.unitCost)
+
+                mind.append(f.col)
+                mval.append(params.productAbscenceCost)
+
+                rhs += (params.unitPrice * self.scenarios.getForecast(sc, t))
+
+            # create the constraint
+            self.createConstraint(mind,mval,"E",rhs,"foValue_" + sid)
+            numCons += 1
+
+        return numCons
+
+    def createRobustConstraint(self):
+        numCons = 0
+
+        zp = self.getVariable("zp")
+        zn = self.getVariable("zn")
+
+        # this constraint is for each scenario
+        for sid in self.scenarios.ids:
+            mind = []
+            mval = []
+
+            mind.append(zp.col)
+            mval.append(1.0)
+
+            mind.append(zn.col)
+            mval.append(-1.0)
+
+            # get the zsp variable
+            zsp = self.getVariable("zsp_" + sid)
+            mind.append(zsp.col)
+            mval.append(-1.0)
+
+            # get the zsn variable
+            zsn = self.getVariable("zsn_" + sid)
+            mind.append(zsn.col)
+            mval.append(1.0)
+
+            self.createConstraint(mind,mval,"L",0.0,"robust_" + sid)
+            numCons += 1
+
+        return numCons
+
+    def createConstraint(self, mind, mval, sense, rhs, name):
+        self.lp.linear_constraints.add(lin_expr=[[mind, mval]],
+                                    senses=[sense], rhs=[rhs],
+                                    names=[name])
+    #endregion
+
+    # Planning state saved by the checkpoints (the lp is rebuilt after a resume)
+    def getState(self):
+        return dict((name, getattr(self, name)) for name in self.stateFields)
+
+    def setState(self, state):
+        for name in self.stateFields:
+            setattr(self, name, state[name])
+
+    def reset(self):
+        self.lp = 0
+        self.backend = 0
+        self.variables = {}
+        self.columns = 0
+        self.numCols = 0
+
+    def createLp(self):
+        # in incremental mode the model of the previous day is shifted in place and the dual simplex starts from
+        # the previous optimal basis. The basis is not shifted with the days (nor with the new scenarios) and a
+        # reposition bound that changes between 0 and infinity breaks its dual feasibility, so it is only a
+        # heuristic starting point.
+        # Backends without a native model (see LpBackend) are rebuilt every day.
+        if params.incrementalModel and self.lp != 0:
+            self.updateBulkModel()
+            return
+
+        self.reset()
+        self.backend = LpBackend.create()
+        self.lp = self.backend.lp
+        if self.lp != 0 and params.incrementalModel:
+            self.lp.parameters.lpmethod.set(self.lp.parameters.lpmethod.values.dual)
+            self.lp.parameters.advance.set(1)
+        self.createModel()
+
+    def solve(self, day):
+        self.currentDay = day
+        self.finalDay = self.currentDay + params.horizon
+        Instrumentation.begin("robust", day)
+
+        # create the list of scenarios for the current day
+        self.createScenarios()
+        Instrumentation.mark("robust", "scenarios")
+
+        try:
+            if params.lazyScenarios:
+                self.solveLazy()
+                Instrumentation.mark("robust", "lazySolve")
+                LpExporter.export(self.backend, "robusto", day)
+                Instrumentation.mark("robust", "export")
+                Instrumentation.end("robust", self.backend, numScenarios=len(self.scenarios))
+                return self.problemSolution
+
+            # create the lp model
+            self.createLp()
+            Instrumentation.mark("robust", "createLp")
+
+            # export the lp (if enabled)
+            LpExporter.export(self.backend, "robusto", day)
+            Instrumentation.mark("robust", "export")
+
+            # solve the model
+            self.backend.solve()
+            Instrumentation.mark("robust", "solve")
+
+            # process problem solution
+            x = self.backend.getValues()
+
+            # save the solution data
+            self.saveSolution(x)
+            Instrumentation.mark("robust", "extraction")
+
+        except LpSolveError as e:
+            print "Error on t" + str(self.currentDay) + ": " + str(e) + ", keeping the plan of the previous day"
+            LpExporter.export(self.backend, "robusto", day, failed=True)
+            self.keepPreviousPlan()
+            Instrumentation.end("robust", numScenarios=len(self.scenarios), failed=True)
+            return self.problemSolution
+        except:
+            print "Error on t" + str(self.currentDay)
+            LpExporter.export(self.backend, "robusto", day, failed=True)
+            raise
+
+        Instrumentation.end("robust", self.backend, numScenarios=len(self.scenarios))
+        return self.problemSolution
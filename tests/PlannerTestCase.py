@@ -0,0 +1,32 @@
+import os
+import unittest
+import numpy as np
+from src.inputdata.Parameters import Parameters as params
+from src.inputdata.DemandLoader import DemandLoader
+from src.inputdata.ProblemData import ProblemData
+
+dataDir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+# Base of the planner tests: every test starts from the default Parameters (restored afterwards) on the sample
+# data of the repository, with the open source lp backend
+class PlannerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.savedParameters = dict((name, value) for name, value in vars(params).items() if not name.startswith("_"))
+        params.dataFile = os.path.join(dataDir, "data_mid.csv")
+        params.dataCacheDir = None
+        params.plotMode = "off"
+        params.lpBackend = "highs"
+
+    def tearDown(self):
+        for name, value in self.savedParameters.items():
+            setattr(params, name, value)
+
+    # ProblemData of a single store with the given daily demand
+    @staticmethod
+    def createData(demand):
+        rows = np.zeros(len(demand), dtype=DemandLoader.dtype)
+        rows["store"] = 1
+        rows["date"] = np.datetime64("2014-01-01") + np.arange(len(demand))
+        rows["sales"] = demand
+        return ProblemData(1, rows)
@@ -0,0 +1,64 @@
+import unittest
+import numpy as np
+from PlannerTestCase import PlannerTestCase
+from src.inputdata.Parameters import Parameters as params
+from src.inputdata.RandomStreams import RandomStreams
+from src.solvers.DeterministicSolver import DeterministicSolver
+
+
+# The fast path (deterministicMode "fast") must give the objective and the repositions of the lp.
+# The tolerances are those of the interior point method of python 2's scipy (see HighsBackend), cplex and HiGHS
+# match to the rounding.
+class FastSolutionTest(PlannerTestCase):
+    objectiveTolerance = 1e-5  # relative
+    repositionTolerance = 1e-2  # units
+    # Rolling planning of days [0, planningDays) with the lp, the fast solution of every day is compared with it
+    def assertFastSolutionMatchesLp(self, horizon, leadTime, repositionInterval, numDays, planningDays=None, seed=0):
+        params.horizon = horizon
+        params.currentLeadTime = leadTime
+        params.currentRepositionInterval = repositionInterval
+        params.deterministicMode = "lp"
+        planningDays = horizon if planningDays is None else planningDays
+        data = self.createData(np.random.RandomState(seed).randint(0, 200, numDays))
+        data.setRepositionDays()
+        data.computeForecasts(0, planningDays, RandomStreams(seed))
+
+        solver = DeterministicSolver(data)
+        for t in range(planningDays):
+            solver.solve(t)
+            r, f, s, obj = solver.computeFastSolution()
+            lpObj = solver.backend.getObjectiveValue()
+            self.assertLess(abs(obj - lpObj), self.objectiveTolerance * max(1.0, abs(lpObj)),
+                            "objective of day " + str(t))
+            for rDay in solver.getRepositionDays():
+                self.assertLess(abs(r[rDay - t] - solver.plannedRepositions[t][rDay]), self.repositionTolerance,
+                                "reposition of day " + str(rDay) + " planned on day " + str(t))
+
+    def testLeadTimes(self):
+        for leadTime in (1, 2, 3, 5, 8):
+            self.assertFastSolutionMatchesLp(14, leadTime, 3, 40, seed=leadTime)
+
+    def testRepositionIntervals(self):
+        for interval in (1, 2, 4, 7):
+            self.assertFastSolutionMatchesLp(14, 3, interval, 40, seed=interval)
+
+    # the lead time is longer than the horizon, nothing bought in the horizon arrives in it
+    def testLeadTimePastTheHorizon(self):
+        self.assertFastSolutionMatchesLp(5, 7, 2, 30)
+
+    # the horizon of the last planning day ends on the last day of the data
+    def testHorizonUpToTheLastDay(self):
+        self.assertFastSolutionMatchesLp(12, 3, 3, 23)
+
+    def testShortHorizons(self):
+        for horizon in (1, 2, 3):
+            self.assertFastSolutionMatchesLp(horizon, 1, 1, 20, seed=horizon)
+
+    # the initial stock covers the first days (zero demand days in between)
+    def testSparseDemand(self):
+        params.initialStockDays = 2
+        self.assertFastSolutionMatchesLp(10, 2, 3, 30, seed=11)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import numpy as np
+from PlannerTestCase import PlannerTestCase
+from src.inputdata.Parameters import Parameters as params
+from src.inputdata.ProblemData import ProblemData
+from src.inputdata.RandomStreams import RandomStreams
+from src.solvers.DeterministicSolver import DeterministicSolver
+from src.solvers.RobustSolver import RobustSolver
+from src.solvers.HighsBackend import HighsBackend
+from src.solvers.LpSolveError import LpSolveError
+
+
+class HighsBackendTest(PlannerTestCase):
+    def plan(self, data, firstDay, lastDay):
+        streams = RandomStreams()
+        data.setRepositionDays()
+        data.computeForecasts(firstDay, lastDay, streams)
+        dSolver = DeterministicSolver(data)
+        rSolver = RobustSolver(data, streams)
+        for t in range(firstDay, lastDay):
+            dSolver.solve(t)
+            rSolver.solve(t)
+        return dSolver, rSolver
+
+    # Regression run of the default experiment on the sample data (with 20 scenarios to keep it short): every day
+    # of both models is solved, on python 2's scipy the robust lp of day 25 needs the row scaled interior point
+    def testDefaultExperiment(self):
+        params.numScenarios = 20
+        params.deterministicMode = "lp"
+        params.currentUncertainty, params.currentRobustness = 0.3, 1
+        params.currentRepositionInterval, params.currentLeadTime = 3, 3
+        dSolver, rSolver = self.plan(ProblemData(), params.initialDay, params.initialDay + params.horizon)
+
+        self.assertEqual(dSolver.failedDays, [])
+        self.assertEqual(rSolver.failedDays, [])
+        for solver in (dSolver, rSolver):
+            self.assertTrue(np.all(np.array(solver.repositions) >= -1e-6))
+        self.assertGreater(sum(rSolver.repositions), 0)
+
+    # A day whose lp cannot be solved keeps the plan of the previous day and the next days are planned as usual
+    def testFailedDayKeepsThePreviousPlan(self):
+        params.horizon = 8
+        params.numScenarios = 4
+        params.deterministicMode = "lp"
+        params.currentRepositionInterval, params.currentLeadTime = 1, 2
+        data = self.createData(np.random.RandomState(1).randint(50, 150, 40))
+
+        solve = HighsBackend.solve
+        def failOnDay3(backend):
+            if failOnDay3.day == 3:
+                raise LpSolveError("no solution")
+            solve(backend)
+
+        HighsBackend.solve = failOnDay3
+        try:
+            streams = RandomStreams()
+            data.setRepositionDays()
+            data.computeForecasts(0, 6, streams)
+            solvers = (DeterministicSolver(data), RobustSolver(data, streams))
+            for t in range(6):
+                failOnDay3.day = t
+                for solver in solvers:
+                    solver.solve(t)
+        finally:
+            HighsBackend.solve = solve
+
+        for solver in solvers:
+            self.assertEqual(solver.failedDays, [3])
+            self.assertEqual(solver.repositions[3], solver.plannedRepositions[2][3])
+            self.assertEqual(solver.plannedRepositions[3][4], solver.plannedRepositions[2][4])
+            self.assertNotEqual(solver.plannedRepositions[4], [0] * data.numDays)
+
+
+if __name__ == "__main__":
+    unittest.main()
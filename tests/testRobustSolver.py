@@ -0,0 +1,71 @@
+import copy
+import unittest
+import numpy as np
+from PlannerTestCase import PlannerTestCase
+from src.inputdata.Parameters import Parameters as params
+from src.inputdata.RandomStreams import RandomStreams
+from src.solvers.RobustSolver import RobustSolver
+
+
+# Lazy scenario generation (Parameters.lazyScenarios) must give the plans and the objective of the full model
+class LazyScenariosTest(PlannerTestCase):
+    objectiveTolerance = 1e-5  # relative, the interior point method of python 2's scipy (see HighsBackend)
+    repositionTolerance = 0.5  # units, of repositions in the thousands
+
+    def setUp(self):
+        PlannerTestCase.setUp(self)
+        params.horizon = 10
+        params.currentUncertainty = 0.5
+        params.currentRepositionInterval = 3
+        params.currentLeadTime = 2
+
+    # Plans days [0, horizon) with the full and the lazy model, the lazy one starting each day from the state of
+    # the full one. Returns the lp solves of each lazy day
+    def planBoth(self, numScenarios, initialScenarios, scenariosPerIteration, seed=0):
+        params.numScenarios = numScenarios
+        params.lazyInitialScenarios = initialScenarios
+        params.lazyScenariosPerIteration = scenariosPerIteration
+        data = self.createData(np.random.RandomState(seed).randint(500, 1500, 3 * params.horizon))
+        data.setRepositionDays()
+        streams = RandomStreams(seed)
+        data.computeForecasts(0, params.horizon, streams)
+
+        full = RobustSolver(data, streams)
+        lazy = RobustSolver(data, streams)
+        iterations = []
+        for t in range(params.horizon):
+            lazy.setState(copy.deepcopy(full.getState()))
+            params.lazyScenarios = False
+            full.solve(t)
+            fullObjective = full.backend.getObjectiveValue()
+
+            params.lazyScenarios = True
+            solves = [0]
+            solve = lazy.createLp
+            def countingCreateLp():
+                solves[0] += 1
+                solve()
+            lazy.createLp = countingCreateLp
+            lazy.solve(t)
+            del lazy.createLp
+            iterations.append(solves[0])
+
+            self.assertLess(abs(lazy.backend.getObjectiveValue() - fullObjective),
+                            self.objectiveTolerance * max(1.0, abs(fullObjective)), "objective of day " + str(t))
+            for rDay in full.getRepositionDays():
+                self.assertLess(abs(lazy.plannedRepositions[t][rDay] - full.plannedRepositions[t][rDay]),
+                                self.repositionTolerance, "reposition of day " + str(rDay) + " planned on day " + str(t))
+            self.assertLess(abs(lazy.repositions[t] - full.repositions[t]), self.repositionTolerance)
+        return iterations
+
+    def testSameAsFullModel(self):
+        self.planBoth(30, 4, 4)
+
+    # a single initial scenario and one more per iteration: several rounds of cuts on every day
+    def testSeveralRounds(self):
+        iterations = self.planBoth(20, 1, 1, seed=3)
+        self.assertGreater(max(iterations), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
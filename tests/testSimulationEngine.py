@@ -0,0 +1,72 @@
+import unittest
+import numpy as np
+from PlannerTestCase import PlannerTestCase
+from src.inputdata.Parameters import Parameters as params
+from src.solutiondata.SimulationEngine import SimulationEngine
+
+
+# The closed form of SimulationEngine must give the obj, faults and stocks of the per day simulation loop
+class SimulationEngineTest(PlannerTestCase):
+    tolerance = 1e-10  # relative, the cumulative sums round differently than the loop
+    numDays = 60
+
+    def setUp(self):
+        PlannerTestCase.setUp(self)
+        self.rng = np.random.RandomState(0)
+        self.demand = self.rng.randint(0, 100, self.numDays).astype(float)
+
+    # Random plan: repositions on about a third of the days
+    def createPlan(self):
+        return self.rng.randint(0, 300, self.numDays) * (self.rng.rand(self.numDays) < 0.3)
+
+    # The old per day loop of Main.computeSimulationData, with the lead time of the solvers and positive faults
+    def simulate(self, r, leadTime, initialStock, initialDay, finalDay):
+        obj = [0 for t in range(self.numDays)]
+        fault = [0 for t in range(self.numDays)]
+        stock = [0 for t in range(self.numDays)]
+        stock[initialDay] = initialStock
+
+        for t in range(initialDay, finalDay):
+            available = stock[t]
+            if 0 <= t - leadTime + 1 < self.numDays:
+                available += r[t - leadTime + 1]
+
+            fault[t] = max(0, self.demand[t] - available)
+            if t + 1 < finalDay:
+                stock[t + 1] = max(0, available - self.demand[t])
+
+            value = (params.unitPrice * self.demand[t]) - (params.productAbscenceCost * fault[t]) - \
+                    (params.unitCost * r[t]) - (params.unitStockageCost * stock[t])
+            obj[t] = value if t == initialDay else obj[t - 1] + value
+        return obj, fault, stock
+
+    def assertMatchesLoop(self, plans, leadTimes, initialStock=150, initialDay=10, finalDay=50):
+        engine = SimulationEngine(self.demand, initialStock, initialDay, finalDay)
+        result = engine.run(plans, leadTimes)
+        perPolicy = np.broadcast_to(leadTimes, (len(plans),))
+        for p in range(len(plans)):
+            expected = self.simulate(plans[p], perPolicy[p], initialStock, initialDay, finalDay)
+            for name, matrix, values in zip(("obj", "fault", "stock"), result, expected):
+                error = np.abs(matrix[p] - values).max()
+                self.assertLess(error, self.tolerance * max(1.0, np.abs(values).max()),
+                                name + " of policy " + str(p) + ", lead time " + str(perPolicy[p]))
+
+    def testLeadTimeZero(self):
+        self.assertMatchesLoop([self.createPlan() for p in range(4)], 0)
+
+    def testSharedLeadTime(self):
+        for leadTime in (1, 3, 7):
+            self.assertMatchesLoop([self.createPlan() for p in range(4)], leadTime)
+
+    def testLeadTimePerPolicy(self):
+        leadTimes = [0, 1, 2, 5, 12]
+        self.assertMatchesLoop([self.createPlan() for p in leadTimes], leadTimes)
+
+    # no initial stock: faults from the first day, and the plan ends with the data
+    def testWholeData(self):
+        self.assertMatchesLoop([self.createPlan() for p in range(3)], [0, 2, 4], initialStock=0, initialDay=0,
+                               finalDay=self.numDays)
+
+
+if __name__ == "__main__":
+    unittest.main()